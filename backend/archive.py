@@ -0,0 +1,165 @@
+import asyncio
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteOne
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Cold tier for contact requests that no longer need to be in the hot indexes
+ARCHIVE_COLLECTION = "contact_requests_archive"
+# Run the archival job in the leader worker
+ARCHIVE_ENABLED = os.getenv('CONTACT_ARCHIVE_ENABLED', 'false').lower() == 'true'
+# Leads with these statuses are archived once they are this old...
+ARCHIVE_STATUSES = [
+    status.strip() for status in os.getenv('CONTACT_ARCHIVE_STATUSES', 'completed').split(',') if status.strip()
+]
+ARCHIVE_AFTER_DAYS = int(os.getenv('CONTACT_ARCHIVE_AFTER_DAYS', '180'))
+# ...and leads with any other status once they are this old (abandoned)
+ARCHIVE_STALE_AFTER_DAYS = int(os.getenv('CONTACT_ARCHIVE_STALE_AFTER_DAYS', '365'))
+# Leads restored or edited this recently stay hot whatever their age
+ARCHIVE_HOLD_DAYS = int(os.getenv('CONTACT_ARCHIVE_HOLD_DAYS', '30'))
+ARCHIVE_BATCH_SIZE = int(os.getenv('CONTACT_ARCHIVE_BATCH_SIZE', '500'))
+ARCHIVE_INTERVAL = float(os.getenv('CONTACT_ARCHIVE_INTERVAL', str(24 * 3600)))
+
+# Archived leads are read rarely, so trade CPU for a smaller footprint
+ARCHIVE_STORAGE_ENGINE = {"wiredTiger": {"configString": "block_compressor=zstd"}}
+
+async def _storage_engine(db: AsyncIOMotorDatabase) -> Optional[str]:
+    try:
+        status = await db.command("serverStatus")
+    except Exception as e:
+        # Restricted users and test doubles may not run serverStatus
+        logger.warning(f"Could not read the storage engine: {str(e)}")
+        return None
+    return status.get("storageEngine", {}).get("name")
+
+async def create_archive_collection(db: AsyncIOMotorDatabase):
+    """Create the archive with zstd block compression where the server supports it"""
+    if ARCHIVE_COLLECTION in await db.list_collection_names():
+        return
+    try:
+        if await _storage_engine(db) == "wiredTiger":
+            try:
+                await db.create_collection(ARCHIVE_COLLECTION, storageEngine=ARCHIVE_STORAGE_ENGINE)
+                return
+            except OperationFailure as e:
+                # zstd needs MongoDB 4.2+; fall back to the default compressor
+                logger.warning(f"Creating {ARCHIVE_COLLECTION} without zstd compression: {str(e)}")
+        await db.create_collection(ARCHIVE_COLLECTION)
+    except CollectionInvalid:
+        # Created concurrently
+        pass
+
+def build_archive_query(now: Optional[datetime] = None, older_than_days: Optional[int] = None) -> Dict[str, Any]:
+    """Aged leads, matched through the {status, createdAt, id} and {createdAt, id} indexes
+
+    Leads updated in the last ARCHIVE_HOLD_DAYS are skipped, so a restored
+    lead is not archived again on the next run.
+    """
+    now = now or datetime.utcnow()
+    days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    stale_days = max(ARCHIVE_STALE_AFTER_DAYS, days)
+    return {
+        "$or": [
+            {"status": {"$in": ARCHIVE_STATUSES}, "createdAt": {"$lt": now - timedelta(days=days)}},
+            {"createdAt": {"$lt": now - timedelta(days=stale_days)}}
+        ],
+        # $not also matches legacy leads without updatedAt
+        "updatedAt": {"$not": {"$gte": now - timedelta(days=ARCHIVE_HOLD_DAYS)}}
+    }
+
+async def _copy_to_archive(db: AsyncIOMotorDatabase, documents: List[Dict[str, Any]]):
+    """Insert documents into the archive, skipping ones already copied by an earlier run"""
+    try:
+        await db[ARCHIVE_COLLECTION].insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+
+async def archive_contact_requests(
+    db: AsyncIOMotorDatabase,
+    older_than_days: Optional[int] = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE
+) -> int:
+    """Move aged contact requests to the archive in batches and return how many moved
+
+    Each batch is copied before it is deleted, so a crash in between leaves
+    duplicates that the next run skips, never lost leads. A lead updated
+    after it was copied stays hot and its archive copy is dropped.
+    """
+    query = build_archive_query(older_than_days=older_than_days)
+    archived = 0
+    while True:
+        documents = await db.contact_requests.find(query).sort([("createdAt", 1), ("id", 1)]).to_list(batch_size)
+        if not documents:
+            break
+
+        archived_at = datetime.utcnow()
+        await _copy_to_archive(db, [{**document, "archivedAt": archived_at} for document in documents])
+
+        result = await db.contact_requests.bulk_write(
+            [DeleteOne({"_id": document["_id"], "updatedAt": document.get("updatedAt")}) for document in documents],
+            ordered=False
+        )
+        if result.deleted_count < len(documents):
+            ids = [document["_id"] for document in documents]
+            changed = [document["_id"] async for document in db.contact_requests.find({"_id": {"$in": ids}}, {"_id": 1})]
+            await db[ARCHIVE_COLLECTION].delete_many({"_id": {"$in": changed}})
+            if len(changed) == len(documents):
+                # Every lead in the batch is being edited; try again on the next run
+                break
+
+        archived += result.deleted_count
+        logger.info(f"Archived {result.deleted_count} contact requests")
+    return archived
+
+async def restore_contact_request(db: AsyncIOMotorDatabase, request_id: str) -> bool:
+    """Move one archived contact request back to the hot collection
+
+    The restore counts as an update, which holds the lead in the hot
+    collection for ARCHIVE_HOLD_DAYS.
+    """
+    document = await db[ARCHIVE_COLLECTION].find_one({"id": request_id})
+    if document is None:
+        return False
+
+    document.pop("archivedAt", None)
+    now = datetime.utcnow()
+    document["restoredAt"] = now
+    document["updatedAt"] = now
+    try:
+        await db.contact_requests.insert_one(document)
+    except DuplicateKeyError:
+        # Already restored (or never removed from the hot collection)
+        pass
+    await db[ARCHIVE_COLLECTION].delete_one({"_id": document["_id"]})
+    return True
+
+async def get_archive_stats(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    oldest = await db.contact_requests.find_one(
+        build_archive_query(), projection={"createdAt": 1}, sort=[("createdAt", 1)]
+    )
+    return {
+        "enabled": ARCHIVE_ENABLED,
+        "archived_requests": await db[ARCHIVE_COLLECTION].estimated_document_count(),
+        "hot_requests": await db.contact_requests.estimated_document_count(),
+        "oldest_due": oldest["createdAt"] if oldest else None,
+        "statuses": ARCHIVE_STATUSES,
+        "after_days": ARCHIVE_AFTER_DAYS,
+        "stale_after_days": ARCHIVE_STALE_AFTER_DAYS,
+        "hold_days": ARCHIVE_HOLD_DAYS
+    }
+
+async def run_contact_archival(get_db: Callable[[], AsyncIOMotorDatabase]):
+    """Background loop archiving aged contact requests every ARCHIVE_INTERVAL seconds"""
+    while True:
+        try:
+            await archive_contact_requests(get_db())
+        except Exception as e:
+            logger.error(f"Error archiving contact requests: {str(e)}")
+        await asyncio.sleep(ARCHIVE_INTERVAL)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the precompiled contact email templates
+Reports render time per message (HTML + plain text) for both templates.
+
+Usage (from the backend directory):
+    python benchmarks/bench_email_templates.py [--number 20000]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from email_templates import CONTACT_NOTIFICATION_TEMPLATE, CONFIRMATION_TEMPLATE
+
+SAMPLE_CONTACT = {
+    "name": "Maria Silva",
+    "email": "maria@example.com",
+    "phone": "(11) 91234-5678",
+    "dogName": "Thor",
+    "dogBreed": "Golden Retriever",
+    "dogAge": "3 anos",
+    "selectedPlan": "Intermediário",
+    "behaviorIssues": "Ansiedade de separação & latidos <excessivos>",
+    "message": "Ele destrói a casa quando fica sozinho.",
+    "preferredContact": "WhatsApp"
+}
+
+def bench(name: str, template, number: int):
+    best = min(timeit.repeat(lambda: template.render(SAMPLE_CONTACT), number=number, repeat=5))
+    html_body, text_body = template.render(SAMPLE_CONTACT)
+    per_message = best / number * 1e6
+    print(f"{name:<24} {per_message:8.2f} µs/message   html={len(html_body)}B text={len(text_body)}B")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="renders per timing run")
+    args = parser.parse_args()
+
+    bench("contact_notification", CONTACT_NOTIFICATION_TEMPLATE, args.number)
+    bench("confirmation_email", CONFIRMATION_TEMPLATE, args.number)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the testimonials response serialization paths
+
+pydantic: build TestimonialResponse per document, then validate and dump the
+          list through response_model=List[TestimonialResponse] and render
+          with the stdlib JSONResponse (the previous behaviour).
+fast:     pick the response fields from each document and render with
+          FastJSONResponse (orjson), skipping response_model validation.
+
+Usage (from the backend directory):
+    python benchmarks/bench_serialization.py [--sizes 100 1000 10000]
+"""
+
+import argparse
+import sys
+import timeit
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from models import TestimonialResponse
+from serialization import FastJSONResponse, orjson
+
+FIELDS = tuple(TestimonialResponse.model_fields)
+ADAPTER = TypeAdapter(List[TestimonialResponse])
+
+def make_documents(count: int) -> List[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Cliente {i}",
+            "location": "São Paulo, SP",
+            "rating": 1 + i % 5,
+            "text": "Meu cão ficou muito mais calmo e obediente depois do treinamento. " * 3,
+            "dogName": "Thor",
+            "breed": "Golden Retriever",
+            "approved": True,
+            "createdAt": now,
+            "updatedAt": now
+        }
+        for i in range(count)
+    ]
+
+def pydantic_path(documents: List[dict]) -> bytes:
+    result = [
+        TestimonialResponse(
+            id=doc["id"],
+            name=doc["name"],
+            location=doc["location"],
+            rating=doc["rating"],
+            text=doc["text"],
+            dogName=doc["dogName"],
+            breed=doc["breed"]
+        )
+        for doc in documents
+    ]
+    validated = ADAPTER.validate_python(result)
+    return JSONResponse(ADAPTER.dump_python(validated, mode="json")).body
+
+def fast_path(documents: List[dict]) -> bytes:
+    result = [{field: doc[field] for field in FIELDS} for doc in documents]
+    return FastJSONResponse(result).body
+
+def timed(func, documents, number: int) -> float:
+    return min(timeit.repeat(lambda: func(documents), number=number, repeat=5)) / number
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson ' + orjson.__version__ if orjson else 'json (orjson not installed)'}")
+    print(f"{'items':>8} {'pydantic':>12} {'fast':>12} {'speedup':>8}")
+    for size in args.sizes:
+        documents = make_documents(size)
+        assert pydantic_path(documents) and fast_path(documents)
+        number = max(1, 20000 // size)
+        slow = timed(pydantic_path, documents, number)
+        fast = timed(fast_path, documents, number)
+        print(f"{size:>8} {slow * 1e3:>10.2f}ms {fast * 1e3:>10.2f}ms {slow / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
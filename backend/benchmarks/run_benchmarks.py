@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark suite for the per-request CPU work in the backend
+
+Times each hot path, compares it with the stored baseline and exits with
+status 1 if any path got slower than the baseline by more than the
+threshold.
+
+Machine load shifts absolute timings between runs, so each path is timed
+in rounds interleaved with a fixed calibration workload and compared by its
+median cost relative to that workload. Baselines are only comparable on the
+machine and Python version they were recorded with; on a mismatch the
+comparison is reported but never fails the run.
+
+Usage (from the backend directory):
+    python benchmarks/run_benchmarks.py                  # compare with baseline.json
+    python benchmarks/run_benchmarks.py --save           # record a new baseline
+    python benchmarks/run_benchmarks.py --threshold 0.1 --only mime_as_string
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+import uuid
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import EmailStr, TypeAdapter
+
+from models import ContactRequest, ContactRequestCreate, TestimonialResponse
+from email_service import email_service
+from email_templates import CONFIRMATION_TEMPLATE
+from serialization import dumps
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# The routes still call the pydantic v1 style .dict(); benchmark them as they are
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+SAMPLE_CONTACT = {
+    "name": "Maria Silva",
+    "email": "maria@example.com",
+    "phone": "(11) 91234-5678",
+    "dogName": "Thor",
+    "dogBreed": "Golden Retriever",
+    "dogAge": "3 anos",
+    "selectedPlan": "Intermediário",
+    "behaviorIssues": "Ansiedade de separação & latidos <excessivos>",
+    "message": "Ele destrói a casa quando fica sozinho.",
+    "preferredContact": "WhatsApp"
+}
+
+def make_testimonials(count: int) -> List[dict]:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Cliente {i}",
+            "location": "São Paulo, SP",
+            "rating": 1 + i % 5,
+            "text": "Meu cão ficou muito mais calmo e obediente depois do treinamento. " * 3,
+            "dogName": "Thor",
+            "breed": "Golden Retriever"
+        }
+        for i in range(count)
+    ]
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    """Name -> zero-argument callable doing one unit of work"""
+    contact = ContactRequestCreate(**SAMPLE_CONTACT)
+    email_adapter = TypeAdapter(EmailStr)
+    testimonials = make_testimonials(20)
+    testimonials_adapter = TypeAdapter(List[TestimonialResponse])
+
+    def mime_as_string():
+        message = email_service._build_message(
+            SAMPLE_CONTACT["email"],
+            "CãoFidèle - Solicitação de Agendamento Recebida",
+            CONFIRMATION_TEMPLATE,
+            SAMPLE_CONTACT
+        )
+        return message.as_string()
+
+    return {
+        "contact_request_model": lambda: ContactRequest(**contact.dict()),
+        "email_validation": lambda: email_adapter.validate_python(SAMPLE_CONTACT["email"]),
+        "contact_email_body": lambda: email_service._create_contact_email_body(SAMPLE_CONTACT),
+        "confirmation_email_body": lambda: email_service._create_confirmation_email_body(SAMPLE_CONTACT),
+        "mime_as_string": mime_as_string,
+        "testimonial_response_list": lambda: testimonials_adapter.dump_json(
+            testimonials_adapter.validate_python(testimonials)
+        ),
+        "testimonial_page_dumps": lambda: dumps(testimonials),
+    }
+
+def calibration():
+    """Fixed pure-Python workload the benchmarks are measured against"""
+    return sorted(str(i * 7919 % 1000) for i in range(200))
+
+def _per_call(timer: timeit.Timer, number: int) -> float:
+    return timer.timeit(number=number) / number * 1e6
+
+def measure(func: Callable[[], object], repeat: int) -> Tuple[float, float]:
+    """Median µs per call and median cost relative to the calibration workload
+
+    Each round times the benchmark and the calibration back to back, so a
+    slowdown of the whole machine affects both sides of the ratio.
+    """
+    timer, reference = timeit.Timer(func), timeit.Timer(calibration)
+    number, _ = timer.autorange()
+    reference_number, _ = reference.autorange()
+
+    micros, ratios = [], []
+    for _ in range(repeat):
+        elapsed = _per_call(timer, number)
+        micros.append(elapsed)
+        ratios.append(elapsed / _per_call(reference, reference_number))
+    return round(statistics.median(micros), 3), round(statistics.median(ratios), 4)
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed slowdown, 0.3 = 30%%")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--retries", type=int, default=2, help="re-measure a regressed benchmark this many times before failing")
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    args = parser.parse_args()
+
+    cases = build_cases()
+    if args.only:
+        unknown = set(args.only) - set(cases)
+        if unknown:
+            parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+        cases = {name: cases[name] for name in args.only}
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    comparable = bool(baseline) and baseline.get("environment") == environment()
+    if baseline and not comparable:
+        print(f"note: baseline was recorded on {baseline.get('environment')}, reporting without failing")
+    reference_ratios = (baseline or {}).get("relative", {})
+
+    results: Dict[str, float] = {}
+    relative: Dict[str, float] = {}
+    regressions = []
+    print(f"{'benchmark':<28} {'µs/call':>10} {'baseline':>10} {'change':>8}")
+    for name, func in cases.items():
+        micros, ratio = measure(func, args.repeat)
+        reference = reference_ratios.get(name)
+
+        # Only a slowdown that survives re-measuring counts
+        for _ in range(args.retries):
+            if not reference or ratio / reference - 1 <= args.threshold:
+                break
+            micros, ratio = min((micros, ratio), measure(func, args.repeat), key=lambda result: result[1])
+        results[name] = micros
+        relative[name] = ratio
+
+        if reference:
+            change = ratio / reference - 1
+            flag = ""
+            if change > args.threshold:
+                flag = "  REGRESSION" if comparable else "  slower"
+                if comparable:
+                    regressions.append(name)
+            print(f"{name:<28} {micros:>10.2f} {baseline['results'][name]:>10.2f} {change:>+7.1%}{flag}")
+        else:
+            print(f"{name:<28} {micros:>10.2f} {'-':>10} {'-':>8}")
+
+    if args.save:
+        merged = dict((baseline or {}).get("results", {})) if args.only else {}
+        merged.update(results)
+        merged_relative = dict(reference_ratios) if args.only else {}
+        merged_relative.update(relative)
+        args.baseline.write_text(json.dumps({
+            "recorded": datetime.utcnow().isoformat(timespec="seconds"),
+            "environment": environment(),
+            "unit": "us_per_call",
+            "results": merged,
+            "relative": merged_relative
+        }, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
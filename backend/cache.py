@@ -0,0 +1,80 @@
+import asyncio
+import time
+import logging
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class AsyncRefreshCache(Generic[T]):
+    """Process-local cache for a single value loaded from the database
+
+    - Fresh values (younger than ``ttl``) are served directly.
+    - Stale values are served immediately while one background refresh runs.
+    - Cold or explicitly invalidated entries wait for a refresh, but
+      concurrent callers share that single load (single-flight).
+    - If a refresh fails, the last good value keeps being served.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Awaitable[T]], ttl: float):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+
+        self._value: Optional[T] = None
+        self._has_value = False
+        self._loaded_at = 0.0
+        self._invalidated = False
+        self._generation = 0
+        self._loaded_generation = -1
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def get(self) -> T:
+        if self._has_value and not self._invalidated:
+            if time.monotonic() - self._loaded_at < self.ttl:
+                return self._value
+            # Stale: answer now, revalidate in the background
+            self._start_refresh()
+            return self._value
+
+        try:
+            return await asyncio.shield(self._start_refresh())
+        except Exception:
+            if self._has_value:
+                logger.warning(f"Serving stale {self.name} cache, refresh failed")
+                return self._value
+            raise
+
+    def invalidate(self):
+        """Force the next read to reload, e.g. after a write"""
+        self._invalidated = True
+        self._generation += 1
+        # A load already in flight may predate the write, don't join it
+        self._refresh = None
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._load())
+            # Background refreshes may fail without anyone awaiting them
+            self._refresh.add_done_callback(self._log_failure)
+        return self._refresh
+
+    def _log_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error refreshing {self.name} cache: {str(task.exception())}")
+
+    async def _load(self) -> T:
+        generation = self._generation
+        value = await self.loader()
+        if generation < self._loaded_generation:
+            # A newer load already finished, keep its result
+            return self._value
+
+        self._value = value
+        self._loaded_generation = generation
+        self._has_value = True
+        self._loaded_at = time.monotonic()
+        # A write that raced with this load must trigger another reload
+        self._invalidated = generation != self._generation
+        return value
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from http_cache import CachedRepresentation
+from serialization import dumps
+
+# Sections of the public site, as first shipped in frontend/src/data/mock.js
+CONTENT_SECTIONS = (
+    "trainingPlans", "services", "methodology", "certifications",
+    "stats", "contactInfo", "faqData"
+)
+
+SEED_PATH = Path(__file__).parent / "data" / "site_content.json"
+
+# Version counter in _meta, bumped on every content write
+CONTENT_VERSION_ID = "content"
+
+CONTENT_VERSION_HEADER = "X-Content-Version"
+
+def load_seed() -> Dict[str, Any]:
+    with open(SEED_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+class ContentBundle:
+    """All sections of one content version, serialized once
+
+    The bundle and every section are kept as CachedRepresentations, so each
+    request is served from the same bytes and ETag until the version changes.
+    """
+
+    def __init__(self, version: int, sections: Dict[str, Any]):
+        self.version = version
+        headers = {CONTENT_VERSION_HEADER: str(version)}
+        ordered = {name: sections[name] for name in CONTENT_SECTIONS if name in sections}
+        self.bundle = CachedRepresentation(dumps({"version": version, **ordered}), headers=headers)
+        self.sections = {
+            name: CachedRepresentation(dumps(data), headers=headers)
+            for name, data in ordered.items()
+        }
+
+async def get_content_version(db: AsyncIOMotorDatabase) -> int:
+    document = await db._meta.find_one({"_id": CONTENT_VERSION_ID}, {"version": 1})
+    return document["version"] if document else 0
+
+async def load_content_bundle(db: AsyncIOMotorDatabase, previous: Optional[ContentBundle] = None) -> ContentBundle:
+    """Assemble the current bundle, reusing ``previous`` if the version is unchanged"""
+    version = await get_content_version(db)
+    if previous is not None and previous.version == version:
+        return previous
+    sections = {document["_id"]: document["data"] async for document in db.site_content.find({})}
+    return ContentBundle(version, sections)
+
+async def update_section(db: AsyncIOMotorDatabase, section: str, data: Any) -> int:
+    """Replace one section and return the new content version"""
+    await db.site_content.update_one(
+        {"_id": section},
+        {"$set": {"data": data, "updatedAt": datetime.utcnow()}},
+        upsert=True
+    )
+    document = await db._meta.find_one_and_update(
+        {"_id": CONTENT_VERSION_ID},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return document["version"]
+
+async def seed_site_content(db: AsyncIOMotorDatabase) -> int:
+    """Insert seed sections that are missing; existing (edited) ones are kept"""
+    seed = load_seed()
+    existing = {document["_id"] async for document in db.site_content.find({}, {"_id": 1})}
+    missing = [name for name in CONTENT_SECTIONS if name not in existing and name in seed]
+    if missing:
+        now = datetime.utcnow()
+        await db.site_content.insert_many([
+            {"_id": name, "data": seed[name], "updatedAt": now} for name in missing
+        ])
+        await db._meta.update_one({"_id": CONTENT_VERSION_ID}, {"$inc": {"version": 1}}, upsert=True)
+    return len(missing)
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# How long a worker waits for the leader to finish the one-time bootstrap
+BOOTSTRAP_TIMEOUT = float(os.getenv('BOOTSTRAP_TIMEOUT', '300'))
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class WorkerCoordinator:
+    """Leader election and a readiness flag shared by the serve.py workers
+
+    ``leader`` is a shared multiprocessing Value holding the leader's pid and
+    ``ready`` an Event set once the bootstrap has completed. Without them (a
+    plain ``uvicorn server:app``) the process is its own leader.
+    """
+
+    def __init__(self):
+        self._leader = None
+        self._ready = None
+
+    def configure(self, leader, ready):
+        self._leader = leader
+        self._ready = ready
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader is None or self._leader.value == os.getpid()
+
+    def try_elect(self) -> bool:
+        """Become leader if there is none or the previous one died"""
+        if self._leader is None:
+            return True
+        with self._leader.get_lock():
+            current = self._leader.value
+            if current == 0 or (current != os.getpid() and not _pid_alive(current)):
+                self._leader.value = os.getpid()
+                logger.info(f"Worker {os.getpid()} elected leader")
+        return self.is_leader
+
+    async def bootstrap(self, work: Callable[[], Awaitable[None]], timeout: Optional[float] = None):
+        """Run ``work`` in the leader only; other workers wait until it is done
+
+        A waiting worker takes over the bootstrap if the leader dies first.
+        Workers started after the first bootstrap (a rolling restart) run
+        ``work`` themselves, since they may bring new migrations; it must be
+        safe to run concurrently, as init_database is.
+        """
+        if self._ready is None or self._ready.is_set():
+            await work()
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (BOOTSTRAP_TIMEOUT if timeout is None else timeout)
+        while not self._ready.is_set():
+            if self.try_elect():
+                await work()
+                self._ready.set()
+                logger.info("Bootstrap completed, workers released")
+                return
+            if loop.time() > deadline:
+                raise RuntimeError("Timed out waiting for the leader to bootstrap the database")
+            await loop.run_in_executor(None, self._ready.wait, 1.0)
+
+    async def run_as_leader(self, job: Callable[[], Awaitable[None]], poll: float = 5.0):
+        """Run a background job in the leader only
+
+        Followers keep checking, so the job moves to another worker when the
+        leader exits, e.g. during a rolling restart.
+        """
+        while not self.try_elect():
+            await asyncio.sleep(poll)
+        await job()
+
+# Create global instance
+coordinator = WorkerCoordinator()
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+from urllib.parse import unquote
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from database import get_database
+from models import CONTACT_STATUSES, ContactRequest
+from archive import ARCHIVE_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+CONTACT_COUNTERS_ID = "contact_requests"
+# Legacy contact requests saved before status existed count as the model default
+DEFAULT_CONTACT_STATUS = ContactRequest.model_fields["status"].default
+TESTIMONIAL_SUMMARY_ID = "testimonials"
+
+RECONCILE_INTERVAL = float(os.getenv('COUNTERS_RECONCILE_INTERVAL', '3600'))
+
+async def record_contact_created(db: AsyncIOMotorDatabase, status: str):
+    """Count a new contact request, once it has been saved
+
+    Kept out of the save transaction: every insert touches this one document,
+    so concurrent transactions would abort each other with write conflicts.
+    """
+    result = await db.counters.update_one(
+        {"_id": CONTACT_COUNTERS_ID},
+        {"$inc": {"total": 1, f"by_status.{status}": 1}}
+    )
+    if result.matched_count == 0:
+        # No counters yet: build them from the existing leads, this one included
+        await reconcile_contact_counters(db)
+
+async def record_contact_status_change(db: AsyncIOMotorDatabase, old_status: str, new_status: str):
+    """Move one contact request between status counters, once it has been updated"""
+    if old_status == new_status:
+        return
+    result = await db.counters.update_one(
+        {"_id": CONTACT_COUNTERS_ID},
+        {"$inc": {f"by_status.{old_status}": -1, f"by_status.{new_status}": 1}}
+    )
+    if result.matched_count == 0:
+        await reconcile_contact_counters(db)
+
+async def count_contacts_by_status(db: AsyncIOMotorDatabase) -> Dict[str, int]:
+    """Count contact requests per status, archived ones included
+
+    Archiving moves leads between tiers without touching the counters, so
+    the dashboard totals still cover every lead ever received.
+    """
+    counts = {status: 0 for status in CONTACT_STATUSES}
+    for collection in (db.contact_requests, db[ARCHIVE_COLLECTION]):
+        async for row in collection.aggregate([{"$group": {"_id": {"$ifNull": ["$status", DEFAULT_CONTACT_STATUS]}, "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = counts.get(row["_id"], 0) + row["count"]
+    return counts
+
+async def reconcile_contact_counters(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """Recompute the counters from contact_requests and repair any drift
+
+    Writes racing with the aggregation can leave a small error, which the
+    next reconciliation corrects.
+    """
+    counts = await count_contacts_by_status(db)
+    document = {
+        "total": sum(counts.values()),
+        "by_status": counts,
+        "reconciledAt": datetime.utcnow()
+    }
+
+    previous = await db.counters.find_one_and_replace(
+        {"_id": CONTACT_COUNTERS_ID}, document, upsert=True
+    )
+    if previous and (previous.get("total") != document["total"] or previous.get("by_status") != counts):
+        logger.warning(f"Repaired contact counter drift: {previous.get('by_status')} -> {counts}")
+    return document
+
+async def get_contact_counters(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """Read the counters document, building it on first use"""
+    document: Optional[Dict[str, Any]] = await db.counters.find_one({"_id": CONTACT_COUNTERS_ID})
+    if document is None:
+        document = await reconcile_contact_counters(db)
+    return document
+
+# Summary key for testimonials without a breed; an empty key would be the invalid path "breeds."
+UNKNOWN_BREED = "unknown"
+
+def _breed_key(breed: Optional[str]) -> str:
+    # Breed names become field names, so escape characters MongoDB reserves in paths
+    breed = (breed or "").strip()
+    if not breed:
+        return UNKNOWN_BREED
+    return breed.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+async def record_testimonial_approval(db: AsyncIOMotorDatabase, testimonial: Dict[str, Any], approved: bool):
+    """Add (or remove) one testimonial to the approved rating summary"""
+    delta = 1 if approved else -1
+    result = await db.counters.update_one(
+        {"_id": TESTIMONIAL_SUMMARY_ID},
+        {"$inc": {
+            "count": delta,
+            "rating_sum": delta * testimonial["rating"],
+            f"ratings.{testimonial['rating']}": delta,
+            f"breeds.{_breed_key(testimonial.get('breed'))}": delta
+        }}
+    )
+    if result.matched_count == 0:
+        # No summary yet: build it from testimonials, which already hold this change
+        await rebuild_testimonial_summary(db)
+
+async def rebuild_testimonial_summary(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """Recompute the approved rating summary with one aggregation over testimonials"""
+    pipeline = [
+        {"$match": {"approved": True}},
+        {"$facet": {
+            "totals": [{"$group": {"_id": None, "count": {"$sum": 1}, "rating_sum": {"$sum": "$rating"}}}],
+            "ratings": [{"$group": {"_id": "$rating", "count": {"$sum": 1}}}],
+            "breeds": [{"$group": {"_id": "$breed", "count": {"$sum": 1}}}]
+        }}
+    ]
+    result = (await db.testimonials.aggregate(pipeline).to_list(1))[0]
+    totals = result["totals"][0] if result["totals"] else {"count": 0, "rating_sum": 0}
+
+    breeds: Dict[str, int] = {}
+    for row in result["breeds"]:
+        key = _breed_key(row["_id"])
+        breeds[key] = breeds.get(key, 0) + row["count"]
+
+    document = {
+        "count": totals["count"],
+        "rating_sum": totals["rating_sum"],
+        "ratings": {str(row["_id"]): row["count"] for row in result["ratings"]},
+        "breeds": breeds,
+        "rebuiltAt": datetime.utcnow()
+    }
+    await db.counters.replace_one({"_id": TESTIMONIAL_SUMMARY_ID}, document, upsert=True)
+    return document
+
+async def get_testimonial_summary(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """Average rating, rating histogram and per-breed counts of approved testimonials"""
+    document = await db.counters.find_one({"_id": TESTIMONIAL_SUMMARY_ID})
+    if document is None:
+        document = await rebuild_testimonial_summary(db)
+
+    count = document.get("count", 0)
+    ratings = document.get("ratings", {})
+    return {
+        "count": count,
+        "average_rating": round(document.get("rating_sum", 0) / count, 2) if count else None,
+        "rating_histogram": {str(rating): ratings.get(str(rating), 0) for rating in range(1, 6)},
+        "breeds": {
+            unquote(breed): total
+            for breed, total in sorted(document.get("breeds", {}).items(), key=lambda item: -item[1])
+            if total > 0
+        }
+    }
+
+async def run_counter_reconciliation():
+    """Background loop reconciling the counters every RECONCILE_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(RECONCILE_INTERVAL)
+        try:
+            db = get_database()
+            await reconcile_contact_counters(db)
+            await rebuild_testimonial_summary(db)
+        except Exception as e:
+            logger.error(f"Error reconciling counters: {str(e)}")
@@ -1,11 +1,33 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+import asyncio
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
+
+from migrations import migrate
+from mongo_monitoring import pool_listener, command_listener
 
 # Global variables for database connection
 client: Optional[AsyncIOMotorClient] = None
 database: Optional[AsyncIOMotorDatabase] = None
 
+def get_pool_options() -> Dict[str, Any]:
+    """Motor connection pool settings from the environment; unset ones keep driver defaults"""
+    settings = {
+        'maxPoolSize': ('MONGO_MAX_POOL_SIZE', int),
+        'minPoolSize': ('MONGO_MIN_POOL_SIZE', int),
+        'maxIdleTimeMS': ('MONGO_MAX_IDLE_TIME_MS', int),
+        'waitQueueTimeoutMS': ('MONGO_WAIT_QUEUE_TIMEOUT_MS', int),
+        'serverSelectionTimeoutMS': ('MONGO_SERVER_SELECTION_TIMEOUT_MS', int),
+        'connectTimeoutMS': ('MONGO_CONNECT_TIMEOUT_MS', int),
+        'readPreference': ('MONGO_READ_PREFERENCE', str),
+    }
+    options = {}
+    for option, (env_var, cast) in settings.items():
+        value = os.environ.get(env_var)
+        if value:
+            options[option] = cast(value)
+    return options
+
 async def connect_to_mongo():
     """Create database connection"""
     global client, database
@@ -14,13 +36,20 @@ async def connect_to_mongo():
     if not mongo_url:
         raise ValueError("MONGO_URL environment variable is not set")
     
-    client = AsyncIOMotorClient(mongo_url)
+    pool_options = get_pool_options()
+    client = AsyncIOMotorClient(mongo_url, event_listeners=[pool_listener, command_listener], **pool_options)
     database = client[os.environ.get('DB_NAME', 'caofidele')]
     
     # Test the connection
     try:
         await database.command("ismaster")
         print("✅ Connected to MongoDB successfully")
+        
+        # Warm up the pool so the first requests don't pay for connection setup
+        min_pool_size = pool_options.get('minPoolSize', 0)
+        if min_pool_size:
+            await asyncio.gather(*[database.command("ping") for _ in range(min_pool_size)])
+            print(f"✅ Warmed up {min_pool_size} MongoDB connections")
     except Exception as e:
         print(f"❌ Failed to connect to MongoDB: {e}")
         raise
@@ -39,75 +68,14 @@ def get_database() -> AsyncIOMotorDatabase:
     return database
 
 async def init_database():
-    """Initialize database with sample data"""
+    """Bring the database schema up to date
+
+    Applied versions are recorded in the _meta collection, so once the
+    schema is current this is a single document read.
+    """
     global database
     
     if database is None:
         raise RuntimeError("Database is not initialized")
     
-    # Create indexes
-    await database.testimonials.create_index("approved")
-    await database.testimonials.create_index("createdAt")
-    await database.contact_requests.create_index("status")
-    await database.contact_requests.create_index("createdAt")
-    
-    # Check if testimonials already exist
-    existing_count = await database.testimonials.count_documents({})
-    
-    if existing_count == 0:
-        # Insert sample testimonials
-        sample_testimonials = [
-            {
-                "id": "testimonial_1",
-                "name": "Maria Silva",
-                "location": "São Paulo, SP",
-                "rating": 5,
-                "text": "Meu Golden Retriever estava muito ansioso e destruindo a casa. Após 6 semanas com a metodologia do CãoFidèle, ele se tornou um cão completamente diferente. Profissionalismo excepcional!",
-                "dogName": "Thor",
-                "breed": "Golden Retriever",
-                "approved": True,
-                "createdAt": "2024-12-01T10:00:00Z",
-                "updatedAt": "2024-12-01T10:00:00Z"
-            },
-            {
-                "id": "testimonial_2",
-                "name": "João Santos",
-                "location": "Guarulhos, SP",
-                "rating": 5,
-                "text": "Impressionante como em 2 meses minha Pitbull aprendeu comandos que eu tentava ensinar há anos. A abordagem científica realmente funciona. Recomendo 100%!",
-                "dogName": "Luna",
-                "breed": "Pitbull",
-                "approved": True,
-                "createdAt": "2024-12-02T10:00:00Z",
-                "updatedAt": "2024-12-02T10:00:00Z"
-            },
-            {
-                "id": "testimonial_3",
-                "name": "Ana Costa",
-                "location": "Osasco, SP",
-                "rating": 5,
-                "text": "Estava quase desistindo do meu Border Collie por causa da hiperatividade. O treinamento personalizado foi perfeito. Agora ele é obediente e equilibrado.",
-                "dogName": "Rex",
-                "breed": "Border Collie",
-                "approved": True,
-                "createdAt": "2024-12-03T10:00:00Z",
-                "updatedAt": "2024-12-03T10:00:00Z"
-            },
-            {
-                "id": "testimonial_4",
-                "name": "Carlos Oliveira",
-                "location": "São Bernardo, SP",
-                "rating": 5,
-                "text": "Excelente trabalho com meu Pastor Alemão. O programa de guarda e proteção superou minhas expectativas. Profissional sério e competente.",
-                "dogName": "Kaiser",
-                "breed": "Pastor Alemão",
-                "approved": True,
-                "createdAt": "2024-12-04T10:00:00Z",
-                "updatedAt": "2024-12-04T10:00:00Z"
-            }
-        ]
-        
-        await database.testimonials.insert_many(sample_testimonials)
-        print(f"✅ Inserted {len(sample_testimonials)} sample testimonials")
-    else:
-        print(f"✅ Database already has {existing_count} testimonials")
\ No newline at end of file
+    await migrate(database)
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from database import get_database
+from email_service import CONFIRMATION_EMAIL
+from outbox import enqueue_contact_emails, enqueue_digest_email, run_outbox_transaction
+from search import normalize_key
+
+logger = logging.getLogger(__name__)
+
+# Buffer business notifications into digests instead of one email per lead
+DIGEST_ENABLED = os.getenv('NOTIFICATION_DIGEST', 'false').lower() == 'true'
+# A digest goes out once its oldest lead waited this long...
+DIGEST_INTERVAL = float(os.getenv('DIGEST_INTERVAL_MINUTES', '15')) * 60
+# ...or once this many leads are buffered
+DIGEST_MAX_LEADS = int(os.getenv('DIGEST_MAX_LEADS', '20'))
+# Leads for these plans still get their own notification right away
+DIGEST_PRIORITY_PLANS = {
+    normalize_key(plan) for plan in os.getenv('DIGEST_PRIORITY_PLANS', 'personalizado').split(',') if plan.strip()
+}
+# Leads claimed by a flush that never finished are released after this many seconds
+DIGEST_CLAIM_TIMEOUT = float(os.getenv('DIGEST_CLAIM_TIMEOUT', '300'))
+
+def is_priority_lead(contact_data: Dict[str, Any]) -> bool:
+    return normalize_key(contact_data.get("selectedPlan") or "") in DIGEST_PRIORITY_PLANS
+
+async def enqueue_lead_emails(
+    db: AsyncIOMotorDatabase,
+    contact_id: str,
+    contact_data: Dict[str, Any],
+    session=None
+) -> str:
+    """Queue the emails for a new contact request
+
+    The client confirmation always goes out individually. In digest mode the
+    business notification of a non-priority lead is buffered in
+    notification_digest for the next digest instead.
+    """
+    if not DIGEST_ENABLED or is_priority_lead(contact_data):
+        return await enqueue_contact_emails(db, contact_id, contact_data, session=session)
+
+    await db.notification_digest.insert_one(
+        {"_id": contact_id, "payload": contact_data, "createdAt": datetime.utcnow()},
+        session=session
+    )
+    digest_flusher.notify()
+    return await enqueue_contact_emails(db, contact_id, contact_data, kinds=[CONFIRMATION_EMAIL], session=session)
+
+async def get_digest_stats(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    buffered = await db.notification_digest.count_documents({})
+    oldest = await db.notification_digest.find_one({}, projection={"createdAt": 1}, sort=[("createdAt", 1)])
+    return {
+        "enabled": DIGEST_ENABLED,
+        "buffered": buffered,
+        "oldest_buffered_seconds": (datetime.utcnow() - oldest["createdAt"]).total_seconds() if oldest else 0.0,
+        "interval_minutes": DIGEST_INTERVAL / 60,
+        "max_leads": DIGEST_MAX_LEADS,
+        "priority_plans": sorted(DIGEST_PRIORITY_PLANS),
+        "flushed": digest_flusher.flushed
+    }
+
+class DigestFlusher:
+    """Turns buffered leads into digest emails on the outbox
+
+    Runs in the leader worker, but the admin endpoint can flush from any
+    worker, so each flush first claims its leads by stamping them with a
+    flush id and builds the digest only from the leads it claimed. The
+    digest is queued and its leads removed in one outbox transaction; a
+    flush that dies after claiming releases its leads after
+    DIGEST_CLAIM_TIMEOUT.
+    """
+
+    def __init__(self):
+        self._wakeup: Optional[asyncio.Event] = None
+        self.flushed = 0
+
+    def notify(self):
+        """Check the buffer now, e.g. because it may have reached DIGEST_MAX_LEADS"""
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def flush(self, db: AsyncIOMotorDatabase, force: bool = False) -> int:
+        """Send every due digest and return how many were queued"""
+        digests = 0
+        while True:
+            now = datetime.utcnow()
+            unclaimed = {"$or": [
+                {"flushId": {"$exists": False}},
+                {"claimedAt": {"$lt": now - timedelta(seconds=DIGEST_CLAIM_TIMEOUT)}}
+            ]}
+            leads = await db.notification_digest.find(unclaimed).sort("createdAt", 1).limit(DIGEST_MAX_LEADS).to_list(DIGEST_MAX_LEADS)
+            if not leads:
+                break
+            waited = now - leads[0]["createdAt"]
+            if not force and len(leads) < DIGEST_MAX_LEADS and waited < timedelta(seconds=DIGEST_INTERVAL):
+                break
+
+            flush_id = str(uuid.uuid4())
+            await db.notification_digest.update_many(
+                {"_id": {"$in": [lead["_id"] for lead in leads]}, **unclaimed},
+                {"$set": {"flushId": flush_id, "claimedAt": now}}
+            )
+            claimed = await db.notification_digest.find({"flushId": flush_id}).sort("createdAt", 1).to_list(None)
+            if not claimed:
+                # Another flush got there first
+                continue
+
+            contact_ids = [lead["_id"] for lead in claimed]
+            payloads = [lead["payload"] for lead in claimed]
+            
+            async def queue_digest(session):
+                await enqueue_digest_email(db, contact_ids, payloads, session=session)
+                await db.notification_digest.delete_many({"flushId": flush_id}, session=session)
+            
+            await run_outbox_transaction(db, queue_digest)
+            digests += 1
+            logger.info(f"Queued digest notification for {len(claimed)} contacts")
+        self.flushed += digests
+        return digests
+
+    async def run(self):
+        """Flush due digests until cancelled"""
+        self._wakeup = asyncio.Event()
+        # Often enough that the oldest lead waits at most about one interval
+        poll = min(60.0, DIGEST_INTERVAL / 4)
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.flush(get_database())
+            except Exception as e:
+                logger.error(f"Digest flush failed: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=poll)
+            except asyncio.TimeoutError:
+                pass
+
+# Create global instance
+digest_flusher = DigestFlusher()
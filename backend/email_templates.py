@@ -0,0 +1,287 @@
+import html
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+class CompiledTemplate:
+    """Template parsed once into static chunks and field slots
+
+    Rendering only fills the slots and joins the pre-built chunks, so the
+    static chrome is never re-assembled. Placeholders use ``{field}`` syntax.
+    """
+
+    def __init__(self, source: str):
+        self._chunks: List[str] = []
+        self._slots: List[Tuple[int, str]] = []
+
+        for literal, field, _, _ in Formatter().parse(source):
+            if literal:
+                self._chunks.append(literal)
+            if field is not None:
+                self._slots.append((len(self._chunks), field))
+                self._chunks.append("")
+
+        self.fields = tuple(field for _, field in self._slots)
+
+    def render(self, values: Dict[str, str]) -> str:
+        chunks = self._chunks.copy()
+        for index, field in self._slots:
+            chunks[index] = values[field]
+        return "".join(chunks)
+
+class EmailTemplate:
+    """HTML body and plain-text alternative rendered from the same contact data
+
+    ``defaults`` lists every per-contact field with the text used when it is
+    missing. ``blocks`` are optional sections keyed by slot name, rendered only
+    when their source field is set: ``{slot: (field, html_source, text_source)}``.
+    """
+
+    def __init__(
+        self,
+        html_source: str,
+        text_source: str,
+        defaults: Dict[str, str],
+        blocks: Optional[Dict[str, Tuple[str, str, str]]] = None
+    ):
+        self.html = CompiledTemplate(html_source)
+        self.text = CompiledTemplate(text_source)
+        self.defaults = defaults
+        self.blocks = {
+            slot: (field, CompiledTemplate(html_block), CompiledTemplate(text_block))
+            for slot, (field, html_block, text_block) in (blocks or {}).items()
+        }
+
+    def render(self, data: Dict[str, Any]) -> Tuple[str, str]:
+        """Return the (html, text) bodies for one contact"""
+        raw = {field: str(data.get(field) or default) for field, default in self.defaults.items()}
+        # Every field is escaped exactly once and shared by all HTML fragments
+        escaped = {field: html.escape(value) for field, value in raw.items()}
+
+        for slot, (field, html_block, text_block) in self.blocks.items():
+            if data.get(field):
+                escaped[slot] = html_block.render(escaped)
+                raw[slot] = text_block.render(raw)
+            else:
+                escaped[slot] = raw[slot] = ""
+
+        return self.html.render(escaped), self.text.render(raw)
+
+CONTACT_NOTIFICATION_TEMPLATE = EmailTemplate(
+    html_source="""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #2563eb; border-bottom: 2px solid #f59e0b; padding-bottom: 10px;">
+                    Nova Solicitação de Agendamento - CãoFidèle
+                </h2>
+
+                <h3 style="color: #374151;">Dados do Cliente:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px; font-weight: bold;">Nome:</td><td style="padding: 8px;">{name}</td></tr>
+                    <tr><td style="padding: 8px; font-weight: bold;">Email:</td><td style="padding: 8px;">{email}</td></tr>
+                    <tr><td style="padding: 8px; font-weight: bold;">Telefone:</td><td style="padding: 8px;">{phone}</td></tr>
+                    <tr><td style="padding: 8px; font-weight: bold;">Contato Preferido:</td><td style="padding: 8px;">{preferredContact}</td></tr>
+                </table>
+
+                <h3 style="color: #374151;">Dados do Cão:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px; font-weight: bold;">Nome do Cão:</td><td style="padding: 8px;">{dogName}</td></tr>
+                    <tr><td style="padding: 8px; font-weight: bold;">Raça:</td><td style="padding: 8px;">{dogBreed}</td></tr>
+                    <tr><td style="padding: 8px; font-weight: bold;">Idade:</td><td style="padding: 8px;">{dogAge}</td></tr>
+                </table>
+
+                <h3 style="color: #374151;">Serviço Solicitado:</h3>
+                <p><strong>Plano de Interesse:</strong> {selectedPlan}</p>
+                <p><strong>Comportamentos a Corrigir:</strong> {behaviorIssues}</p>
+
+                {message_block}
+
+                <div style="margin-top: 30px; padding: 20px; background: #eff6ff; border-radius: 8px;">
+                    <p style="margin: 0; font-weight: bold; color: #1d4ed8;">
+                        Entre em contato com o cliente em até 24 horas conforme prometido no site.
+                    </p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """,
+    text_source="""Nova Solicitação de Agendamento - CãoFidèle
+
+Dados do Cliente:
+  Nome: {name}
+  Email: {email}
+  Telefone: {phone}
+  Contato Preferido: {preferredContact}
+
+Dados do Cão:
+  Nome do Cão: {dogName}
+  Raça: {dogBreed}
+  Idade: {dogAge}
+
+Serviço Solicitado:
+  Plano de Interesse: {selectedPlan}
+  Comportamentos a Corrigir: {behaviorIssues}
+{message_block}
+Entre em contato com o cliente em até 24 horas conforme prometido no site.
+""",
+    defaults={
+        "name": "",
+        "email": "",
+        "phone": "",
+        "preferredContact": "Não informado",
+        "dogName": "",
+        "dogBreed": "Não informado",
+        "dogAge": "Não informado",
+        "selectedPlan": "Não informado",
+        "behaviorIssues": "Não informado",
+        "message": ""
+    },
+    blocks={
+        "message_block": (
+            "message",
+            '<h3 style="color: #374151;">Mensagem Adicional:</h3><p style="background: #f9fafb; padding: 15px; border-left: 4px solid #2563eb;">{message}</p>',
+            "\nMensagem Adicional:\n{message}\n"
+        )
+    }
+)
+
+CONFIRMATION_TEMPLATE = EmailTemplate(
+    html_source="""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <div style="text-align: center; margin-bottom: 30px;">
+                    <h1 style="color: #2563eb; margin-bottom: 5px;">CãoFidèle</h1>
+                    <p style="color: #f59e0b; font-weight: bold; margin: 0;">Especialistas em Comportamento Canino</p>
+                </div>
+
+                <div style="background: #eff6ff; padding: 20px; border-radius: 8px; margin-bottom: 30px;">
+                    <h2 style="color: #1d4ed8; margin-top: 0;">Solicitação Recebida com Sucesso!</h2>
+                    <p>Olá <strong>{name}</strong>,</p>
+                    <p>Recebemos sua solicitação de agendamento para o <strong>{dogName}</strong> e entraremos em contato em até <strong>24 horas</strong> para agendar sua avaliação gratuita.</p>
+                </div>
+
+                <h3 style="color: #374151;">Resumo da sua solicitação:</h3>
+                <table style="width: 100%; border-collapse: collapse; background: #f9fafb; border-radius: 8px; overflow: hidden;">
+                    <tr style="background: #e5e7eb;"><td style="padding: 12px; font-weight: bold;">Cão:</td><td style="padding: 12px;">{dogName} ({dogBreed})</td></tr>
+                    <tr><td style="padding: 12px; font-weight: bold;">Plano de Interesse:</td><td style="padding: 12px;">{selectedPlan}</td></tr>
+                    <tr style="background: #e5e7eb;"><td style="padding: 12px; font-weight: bold;">Contato Preferido:</td><td style="padding: 12px;">{preferredContact}</td></tr>
+                </table>
+
+                <div style="margin: 30px 0; padding: 20px; background: linear-gradient(135deg, #eff6ff 0%, #fef3c7 100%); border-radius: 8px;">
+                    <h3 style="color: #1d4ed8; margin-top: 0;">Próximos Passos:</h3>
+                    <ol style="color: #374151;">
+                        <li>Entraremos em contato em até 24 horas</li>
+                        <li>Agendaremos sua avaliação <strong>gratuita</strong></li>
+                        <li>Conheceremos você e o {dogName} pessoalmente</li>
+                        <li>Definiremos o melhor plano para vocês</li>
+                    </ol>
+                </div>
+
+                <div style="margin-top: 30px; padding: 20px; border: 2px solid #e5e7eb; border-radius: 8px;">
+                    <h3 style="color: #374151; margin-top: 0;">Contatos CãoFidèle:</h3>
+                    <p style="margin: 5px 0;"><strong>Telefone/WhatsApp:</strong> (11) 91561-5377</p>
+                    <p style="margin: 5px 0;"><strong>Email:</strong> caofidele@gmail.com</p>
+                    <p style="margin: 5px 0;"><strong>Instagram:</strong> @caofidele</p>
+                </div>
+
+                <div style="text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #e5e7eb;">
+                    <p style="color: #6b7280; font-size: 14px;">
+                        Obrigado por confiar no CãoFidèle para transformar a vida do seu melhor amigo! 🐕
+                    </p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """,
+    text_source="""CãoFidèle - Especialistas em Comportamento Canino
+
+Solicitação Recebida com Sucesso!
+
+Olá {name},
+
+Recebemos sua solicitação de agendamento para o {dogName} e entraremos em contato em até 24 horas para agendar sua avaliação gratuita.
+
+Resumo da sua solicitação:
+  Cão: {dogName} ({dogBreed})
+  Plano de Interesse: {selectedPlan}
+  Contato Preferido: {preferredContact}
+
+Próximos Passos:
+  1. Entraremos em contato em até 24 horas
+  2. Agendaremos sua avaliação gratuita
+  3. Conheceremos você e o {dogName} pessoalmente
+  4. Definiremos o melhor plano para vocês
+
+Contatos CãoFidèle:
+  Telefone/WhatsApp: (11) 91561-5377
+  Email: caofidele@gmail.com
+  Instagram: @caofidele
+
+Obrigado por confiar no CãoFidèle para transformar a vida do seu melhor amigo! 🐕
+""",
+    defaults={
+        "name": "",
+        "dogName": "",
+        "dogBreed": "Raça não informada",
+        "selectedPlan": "A definir na avaliação",
+        "preferredContact": "Telefone"
+    }
+)
+
+# One lead inside the digest notification
+DIGEST_LEAD_TEMPLATE = EmailTemplate(
+    html_source="""
+                <div style="margin-bottom: 20px; padding: 15px; background: #f9fafb; border-left: 4px solid #2563eb;">
+                    <p style="margin: 0 0 5px 0; font-weight: bold;">{name} &middot; {dogName} ({dogBreed}, {dogAge})</p>
+                    <p style="margin: 0;">{email} &middot; {phone} &middot; Prefere: {preferredContact}</p>
+                    <p style="margin: 0;"><strong>Plano:</strong> {selectedPlan} &middot; <strong>Comportamentos:</strong> {behaviorIssues}</p>
+                    {message_block}
+                </div>
+""",
+    text_source="""- {name} | {dogName} ({dogBreed}, {dogAge})
+  {email} | {phone} | Prefere: {preferredContact}
+  Plano: {selectedPlan} | Comportamentos: {behaviorIssues}
+{message_block}""",
+    defaults=CONTACT_NOTIFICATION_TEMPLATE.defaults,
+    blocks={
+        "message_block": (
+            "message",
+            '<p style="margin: 5px 0 0 0; color: #4b5563;">{message}</p>',
+            "  Mensagem: {message}\n"
+        )
+    }
+)
+
+DIGEST_HTML = CompiledTemplate("""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #2563eb; border-bottom: 2px solid #f59e0b; padding-bottom: 10px;">
+                    {count} Novas Solicitações de Agendamento - CãoFidèle
+                </h2>
+{leads}
+                <div style="margin-top: 30px; padding: 20px; background: #eff6ff; border-radius: 8px;">
+                    <p style="margin: 0; font-weight: bold; color: #1d4ed8;">
+                        Entre em contato com os clientes em até 24 horas conforme prometido no site.
+                    </p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """)
+
+DIGEST_TEXT = CompiledTemplate("""{count} Novas Solicitações de Agendamento - CãoFidèle
+
+{leads}
+Entre em contato com os clientes em até 24 horas conforme prometido no site.
+""")
+
+def render_digest(leads: List[Dict[str, Any]]) -> Tuple[str, str]:
+    """Return the (html, text) bodies of one digest covering ``leads``"""
+    rendered = [DIGEST_LEAD_TEMPLATE.render(lead) for lead in leads]
+    count = str(len(leads))
+    return (
+        DIGEST_HTML.render({"count": count, "leads": "".join(html_body for html_body, _ in rendered)}),
+        DIGEST_TEXT.render({"count": count, "leads": "\n".join(text_body for _, text_body in rendered)})
+    )
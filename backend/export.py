@@ -0,0 +1,80 @@
+import csv
+import io
+import os
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from serialization import dumps
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '500'))
+
+CONTACT_EXPORT_FIELDS = [
+    "id", "name", "email", "phone", "dogName", "dogBreed", "dogAge",
+    "selectedPlan", "behaviorIssues", "message", "preferredContact",
+    "status", "createdAt", "updatedAt"
+]
+
+def _as_utc_naive(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def build_export_query(
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if status:
+        query["status"] = status
+    if since or until:
+        created_at: Dict[str, Any] = {}
+        if since:
+            created_at["$gte"] = _as_utc_naive(since)
+        if until:
+            created_at["$lt"] = _as_utc_naive(until)
+        query["createdAt"] = created_at
+    return query
+
+async def iter_batches(collection, query: Dict[str, Any], batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield documents in batches straight off a Motor cursor, oldest first"""
+    projection = {"_id": 0, **{field: 1 for field in CONTACT_EXPORT_FIELDS}}
+    cursor = collection.find(query, projection).sort([("createdAt", 1), ("id", 1)]).batch_size(batch_size)
+
+    batch: List[Dict[str, Any]] = []
+    async for document in cursor:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def chain_batches(*sources: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[List[Dict[str, Any]]]:
+    for batches in sources:
+        async for batch in batches:
+            yield batch
+
+async def ndjson_chunks(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(dumps(document) + b"\n" for document in batch)
+
+async def csv_chunks(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CONTACT_EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+
+    async for batch in batches:
+        for document in batch:
+            writer.writerow({
+                field: value.isoformat() if isinstance(value, datetime) else value
+                for field, value in document.items()
+            })
+        yield buffer.getvalue().encode("utf-8")
+        # Reuse the buffer so memory stays at one batch
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,102 @@
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+class CachedRepresentation:
+    """Serialized response body with a strong ETag and compressed variants
+
+    Built once per content version; each compressed variant is produced on
+    first request for that encoding and then reused for every later request.
+    """
+
+    def __init__(self, body: bytes, media_type: str = "application/json", headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.media_type = media_type
+        self.headers = headers or {}
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self._variants: Dict[str, bytes] = {"identity": body}
+
+    def etag(self, encoding: str = "identity") -> str:
+        # Strong validators must differ between content-codings
+        if encoding == "identity":
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+    def variant(self, encoding: str) -> bytes:
+        body = self._variants.get(encoding)
+        if body is None:
+            if encoding == "br":
+                body = brotli.compress(self.body, quality=11)
+            else:
+                body = gzip.compress(self.body, compresslevel=9, mtime=0)
+            self._variants[encoding] = body
+        return body
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if the client's If-None-Match covers any encoding of this body"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag.startswith(f'"{self.digest}'):
+                return True
+        return False
+
+def negotiate_encoding(accept_encoding: Optional[str], size: int) -> str:
+    """Pick br, gzip or identity from an Accept-Encoding header"""
+    if not accept_encoding or size < MIN_COMPRESS_SIZE:
+        return "identity"
+
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    for coding in ("br", "gzip"):
+        if coding == "br" and brotli is None:
+            continue
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return "identity"
+
+def cached_response(request: Request, representation: CachedRepresentation, cache_control: str) -> Response:
+    """Answer from a cached representation, honouring If-None-Match and Accept-Encoding"""
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), len(representation.body))
+    headers = {
+        **representation.headers,
+        "ETag": representation.etag(encoding),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding"
+    }
+
+    if representation.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=representation.variant(encoding),
+        media_type=representation.media_type,
+        headers=headers
+    )
@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# How long a submission is remembered; also the TTL of the idempotency_keys collection
+IDEMPOTENCY_WINDOW = int(os.getenv('IDEMPOTENCY_WINDOW', '600'))
+
+def contact_fingerprint(email: str, phone: str, dog_name: str) -> str:
+    """Key identifying the same contact submission when no header is sent"""
+    digits = "".join(ch for ch in phone if ch.isdigit())
+    normalized = "\x1f".join([email.strip().lower(), digits, " ".join(dog_name.lower().split())])
+    return "contact:" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def header_key(scope: str, key: str) -> str:
+    # Hash client keys so arbitrary header values are safe to use as _id
+    return f"{scope}:key:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+async def claim(db: AsyncIOMotorDatabase, key: str) -> Optional[Dict[str, Any]]:
+    """Reserve ``key`` for this request
+
+    Returns None when the caller owns the key and must process the request,
+    otherwise the stored record of the earlier request. Records older than the
+    window are taken over, since the TTL monitor only deletes about once a minute.
+    """
+    now = datetime.utcnow()
+    for _ in range(2):
+        try:
+            await db.idempotency_keys.insert_one({"_id": key, "createdAt": now, "response": None})
+            return None
+        except DuplicateKeyError:
+            existing = await db.idempotency_keys.find_one({"_id": key})
+        
+        if existing is None:
+            # Expired between the insert and the read, try again
+            continue
+        if existing["createdAt"] >= now - timedelta(seconds=IDEMPOTENCY_WINDOW):
+            return existing
+        
+        taken = await db.idempotency_keys.find_one_and_update(
+            {"_id": key, "createdAt": existing["createdAt"]},
+            {"$set": {"createdAt": now, "response": None}}
+        )
+        if taken is not None:
+            return None
+    return await db.idempotency_keys.find_one({"_id": key})
+
+async def wait_for_response(db: AsyncIOMotorDatabase, key: str, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+    """Wait briefly for a concurrent duplicate to finish and return its response"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.1)
+        record = await db.idempotency_keys.find_one({"_id": key})
+        if record is None:
+            return None
+        if record.get("response") is not None:
+            return record["response"]
+    return None
+
+async def store_response(db: AsyncIOMotorDatabase, key: str, response: Dict[str, Any]):
+    """Remember the response so repeats get the same answer"""
+    await db.idempotency_keys.update_one({"_id": key}, {"$set": {"response": response}})
+
+async def release(db: AsyncIOMotorDatabase, key: str):
+    """Forget a key whose request failed, so the client can retry"""
+    await db.idempotency_keys.delete_one({"_id": key, "response": None})
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Load test for the CãoFidèle API
+
+Drives a weighted mix of testimonials reads and contact writes from a fixed
+number of concurrent clients for a fixed duration, then writes RPS and
+p50/p95/p99 latency per scenario as JSON, so runs can be diffed between
+releases.
+
+Targets:
+    asgi     the app in-process through httpx's ASGI transport (default)
+    uvicorn  the app under uvicorn on 127.0.0.1, in a background thread
+    --base-url URL
+             an already running server; no stand-ins are started and its own
+             configuration (including rate limits) applies
+
+For the in-process targets Mongo is an in-memory stand-in (mongomock-motor)
+unless --mongo-url points at a local mongod, in which case a throwaway
+database is used. Email goes to a local aiosmtpd sink, so the outbox
+workers deliver for real. Rate limits are switched off unless
+--keep-rate-limits is given.
+
+Usage (from the backend directory):
+    python loadtest/run_load_test.py --concurrency 32 --duration 30 \\
+        --mix testimonials=8,testimonial_stats=1,contact=1 --output report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import httpx
+
+DEFAULT_MIX = "testimonials=8,testimonial_stats=1,contact=1"
+
+def contact_payload(rng: random.Random) -> Dict[str, Any]:
+    # Unique email per request, so idempotency does not fold writes together
+    suffix = uuid.UUID(int=rng.getrandbits(128)).hex[:12]
+    return {
+        "name": f"Cliente Carga {suffix}",
+        "email": f"carga-{suffix}@example.com",
+        "phone": f"(11) 9{rng.randrange(10**7, 10**8)}",
+        "dogName": rng.choice(["Thor", "Luna", "Rex", "Mel", "Bob"]),
+        "dogBreed": rng.choice(["Golden Retriever", "Pitbull", "Border Collie", "Vira-lata"]),
+        "dogAge": f"{rng.randint(1, 12)} anos",
+        "selectedPlan": rng.choice(["basic", "intermediate", "advanced"]),
+        "behaviorIssues": "Puxa a guia e late para visitas",
+        "message": "Mensagem gerada pelo teste de carga",
+        "preferredContact": "whatsapp"
+    }
+
+# name -> request builder returning (method, path, json body)
+SCENARIOS: Dict[str, Callable[[random.Random], Tuple[str, str, Optional[Dict[str, Any]]]]] = {
+    "testimonials": lambda rng: ("GET", "/api/testimonials/", None),
+    "testimonial_stats": lambda rng: ("GET", "/api/testimonials/stats", None),
+    "health": lambda rng: ("GET", "/api/", None),
+    "contact": lambda rng: ("POST", "/api/contact/schedule", contact_payload(rng)),
+}
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies: List[float], statuses: Counter, errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+            "p50": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99": round(percentile(ordered, 0.99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0
+        },
+        "status": {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+class SMTPSink:
+    """Local SMTP server counting delivered messages"""
+
+    def __init__(self):
+        self.messages = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 OK"
+
+    def start(self) -> int:
+        from aiosmtpd.controller import Controller
+
+        port = free_port()
+        self.controller = Controller(self, hostname="127.0.0.1", port=port)
+        self.controller.start()
+        return port
+
+    def stop(self):
+        self.controller.stop()
+
+def configure_environment(args, smtp_port: int):
+    """Point the app at the stand-ins; must run before server is imported"""
+    os.environ.update({
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_PASS": "",
+        "SMTP_STARTTLS": "false",
+        "OUTBOX_POLL_INTERVAL": "1",
+        "DB_NAME": f"caofidele_loadtest_{uuid.uuid4().hex[:8]}",
+    })
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    if not args.keep_rate_limits:
+        for name in ("RATE_LIMIT_CONTACT_PER_IP", "RATE_LIMIT_CONTACT_GLOBAL",
+                     "RATE_LIMIT_TESTIMONIAL_PER_IP", "RATE_LIMIT_TESTIMONIAL_GLOBAL"):
+            os.environ[name] = "off"
+        os.environ["MAX_INFLIGHT_WRITES"] = str(max(32, args.concurrency * 2))
+
+def load_app(args):
+    import server
+    import database
+
+    if not args.mongo_url:
+        from mongomock_motor import AsyncMongoMockClient
+
+        async def connect_in_memory():
+            database.client = AsyncMongoMockClient()
+            database.database = database.client[os.environ["DB_NAME"]]
+
+        async def close_in_memory():
+            database.client = None
+            database.database = None
+
+        # lifespan looks these up in the server module at startup
+        server.connect_to_mongo = connect_in_memory
+        server.close_mongo_connection = close_in_memory
+    return server.app
+
+def drop_test_database(mongo_url: str):
+    from pymongo import MongoClient
+
+    with MongoClient(mongo_url) as client:
+        client.drop_database(os.environ["DB_NAME"])
+
+class UvicornThread:
+    """Serve the app on localhost from a background thread with its own loop"""
+
+    def __init__(self, app):
+        import uvicorn
+
+        self.port = free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self) -> str:
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.05)
+        return f"http://127.0.0.1:{self.port}"
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
+
+async def worker(client: httpx.AsyncClient, rng: random.Random, mix: Dict[str, float],
+                 deadline: float, record_after: float, results: Dict[str, Dict[str, Any]]):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, path, body = SCENARIOS[name](rng)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = None
+        finished = time.perf_counter()
+
+        if started < record_after:
+            continue
+        result = results[name]
+        if status is None or status >= 400:
+            result["errors"] += 1
+        result["statuses"][status if status is not None else "transport_error"] += 1
+        if status is not None:
+            result["latencies"].append(finished - started)
+
+async def drive(client: httpx.AsyncClient, args) -> Tuple[Dict[str, Dict[str, Any]], float]:
+    results = {name: {"latencies": [], "statuses": Counter(), "errors": 0} for name in args.mix}
+    start = time.perf_counter()
+    record_after = start + args.warmup
+    deadline = record_after + args.duration
+    await asyncio.gather(*[
+        worker(client, random.Random(args.seed + i), args.mix, deadline, record_after, results)
+        for i in range(args.concurrency)
+    ])
+    return results, time.perf_counter() - record_after
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def build_report(args, target: str, results, elapsed: float, emails: Optional[int]) -> Dict[str, Any]:
+    all_latencies: List[float] = []
+    all_statuses: Counter = Counter()
+    scenarios = {}
+    for name, result in results.items():
+        all_latencies.extend(result["latencies"])
+        all_statuses.update(result["statuses"])
+        scenarios[name] = summarize(result["latencies"], result["statuses"], result["errors"], elapsed)
+
+    return {
+        "config": {
+            "target": target,
+            "mongo": "in-memory" if not args.base_url and not args.mongo_url else ("external" if args.base_url else "mongod"),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": args.mix,
+            "seed": args.seed,
+            "rate_limits": bool(args.base_url or args.keep_rate_limits)
+        },
+        "environment": {
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "total": summarize(all_latencies, all_statuses, sum(r["errors"] for r in results.values()), elapsed),
+        "scenarios": scenarios,
+        "emails_delivered": emails
+    }
+
+async def run_in_process(args, app) -> Tuple[Dict[str, Dict[str, Any]], float]:
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            return await drive(client, args)
+
+async def run_over_http(args, base_url: str) -> Tuple[Dict[str, Dict[str, Any]], float]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        return await drive(client, args)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--base-url", help="load an already running server instead of an in-process app")
+    parser.add_argument("--mongo-url", help="use this mongod (throwaway database) instead of in-memory Mongo")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before the run")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"weighted scenarios, default {DEFAULT_MIX}; available: {', '.join(SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--keep-rate-limits", action="store_true")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    sink = None
+    emails = None
+    if args.base_url:
+        target = "external"
+        results, elapsed = asyncio.run(run_over_http(args, args.base_url))
+    else:
+        sink = SMTPSink()
+        configure_environment(args, sink.start())
+        app = load_app(args)
+        target = args.target
+        try:
+            if args.target == "uvicorn":
+                server = UvicornThread(app)
+                base_url = server.start()
+                try:
+                    results, elapsed = asyncio.run(run_over_http(args, base_url))
+                finally:
+                    server.stop()
+            else:
+                results, elapsed = asyncio.run(run_in_process(args, app))
+        finally:
+            sink.stop()
+            if args.mongo_url:
+                drop_test_database(args.mongo_url)
+        emails = sink.messages
+
+    report = json.dumps(build_report(args, target, results, elapsed, emails), indent=2)
+    if args.output:
+        Path(args.output).write_text(report + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
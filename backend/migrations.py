@@ -0,0 +1,235 @@
+import asyncio
+import os
+import socket
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from idempotency import IDEMPOTENCY_WINDOW
+from profiling import PROFILE_RETENTION
+from search import TESTIMONIAL_TEXT_INDEX, testimonial_search_keys
+from content import seed_site_content
+from archive import ARCHIVE_COLLECTION, create_archive_collection
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_ID = "schema"
+LOCK_ID = "migration_lock"
+
+# A crashed migrator's lock is taken over after this many seconds
+LOCK_LEASE = int(os.getenv('MIGRATION_LOCK_LEASE', '300'))
+# How long other workers wait for a running migration
+WAIT_TIMEOUT = float(os.getenv('MIGRATION_WAIT_TIMEOUT', '300'))
+
+MIGRATIONS: List[Tuple[int, str, Callable[[AsyncIOMotorDatabase], Awaitable[None]]]] = []
+
+def migration(version: int, description: str):
+    """Register a schema migration; versions are applied once, in order"""
+    def register(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return register
+
+SAMPLE_TESTIMONIALS = [
+    {
+        "id": "testimonial_1",
+        "name": "Maria Silva",
+        "location": "São Paulo, SP",
+        "rating": 5,
+        "text": "Meu Golden Retriever estava muito ansioso e destruindo a casa. Após 6 semanas com a metodologia do CãoFidèle, ele se tornou um cão completamente diferente. Profissionalismo excepcional!",
+        "dogName": "Thor",
+        "breed": "Golden Retriever",
+        "approved": True,
+        "createdAt": datetime(2024, 12, 1, 10, 0, 0),
+        "updatedAt": datetime(2024, 12, 1, 10, 0, 0)
+    },
+    {
+        "id": "testimonial_2",
+        "name": "João Santos",
+        "location": "Guarulhos, SP",
+        "rating": 5,
+        "text": "Impressionante como em 2 meses minha Pitbull aprendeu comandos que eu tentava ensinar há anos. A abordagem científica realmente funciona. Recomendo 100%!",
+        "dogName": "Luna",
+        "breed": "Pitbull",
+        "approved": True,
+        "createdAt": datetime(2024, 12, 2, 10, 0, 0),
+        "updatedAt": datetime(2024, 12, 2, 10, 0, 0)
+    },
+    {
+        "id": "testimonial_3",
+        "name": "Ana Costa",
+        "location": "Osasco, SP",
+        "rating": 5,
+        "text": "Estava quase desistindo do meu Border Collie por causa da hiperatividade. O treinamento personalizado foi perfeito. Agora ele é obediente e equilibrado.",
+        "dogName": "Rex",
+        "breed": "Border Collie",
+        "approved": True,
+        "createdAt": datetime(2024, 12, 3, 10, 0, 0),
+        "updatedAt": datetime(2024, 12, 3, 10, 0, 0)
+    },
+    {
+        "id": "testimonial_4",
+        "name": "Carlos Oliveira",
+        "location": "São Bernardo, SP",
+        "rating": 5,
+        "text": "Excelente trabalho com meu Pastor Alemão. O programa de guarda e proteção superou minhas expectativas. Profissional sério e competente.",
+        "dogName": "Kaiser",
+        "breed": "Pastor Alemão",
+        "approved": True,
+        "createdAt": datetime(2024, 12, 4, 10, 0, 0),
+        "updatedAt": datetime(2024, 12, 4, 10, 0, 0)
+    }
+]
+
+async def _drop_indexes(collection, names):
+    existing = await collection.index_information()
+    for name in names:
+        if name in existing:
+            await collection.drop_index(name)
+
+@migration(1, "Create base indexes")
+async def create_base_indexes(db: AsyncIOMotorDatabase):
+    await db.testimonials.create_index([("approved", 1), ("createdAt", -1), ("id", -1)])
+    await db.testimonials.create_index("createdAt")
+    # Superseded by the compound indexes
+    await _drop_indexes(db.testimonials, ["approved_1", "approved_1_createdAt_-1"])
+
+    await db.contact_requests.create_index([("status", 1), ("createdAt", 1), ("id", 1)])
+    await db.contact_requests.create_index([("createdAt", -1), ("id", -1)])
+    await _drop_indexes(db.contact_requests, ["status_1", "createdAt_1"])
+
+    await db.email_outbox.create_index([("status", 1), ("nextAttemptAt", 1)])
+    await db.email_outbox.create_index("sentAt", expireAfterSeconds=7 * 24 * 3600)
+    await db.idempotency_keys.create_index("createdAt", expireAfterSeconds=IDEMPOTENCY_WINDOW)
+
+@migration(2, "Seed sample testimonials")
+async def seed_sample_testimonials(db: AsyncIOMotorDatabase):
+    existing_count = await db.testimonials.count_documents({})
+    if existing_count == 0:
+        await db.testimonials.insert_many([dict(testimonial) for testimonial in SAMPLE_TESTIMONIALS])
+        logger.info(f"Inserted {len(SAMPLE_TESTIMONIALS)} sample testimonials")
+    else:
+        logger.info(f"Database already has {existing_count} testimonials")
+
+@migration(3, "Store legacy string timestamps as dates")
+async def normalize_timestamps(db: AsyncIOMotorDatabase):
+    for collection in (db.testimonials, db.contact_requests):
+        for field in ("createdAt", "updatedAt"):
+            async for document in collection.find({field: {"$type": "string"}}, {field: 1}):
+                value = datetime.fromisoformat(document[field].replace("Z", "+00:00"))
+                if value.tzinfo is not None:
+                    value = value.replace(tzinfo=None) - value.utcoffset()
+                await collection.update_one({"_id": document["_id"]}, {"$set": {field: value}})
+
+@migration(4, "Expire stored request profiles")
+async def create_profile_indexes(db: AsyncIOMotorDatabase):
+    await db.request_profiles.create_index("createdAt", expireAfterSeconds=PROFILE_RETENTION)
+    await db.request_profiles.create_index("id", unique=True)
+
+@migration(5, "Index testimonials for filtered and text search")
+async def create_testimonial_search_indexes(db: AsyncIOMotorDatabase):
+    async for document in db.testimonials.find({"breedKey": {"$exists": False}}, {"breed": 1, "location": 1}):
+        keys = testimonial_search_keys(document.get("breed", ""), document.get("location", ""))
+        await db.testimonials.update_one({"_id": document["_id"]}, {"$set": keys})
+
+    # Equality, sort, range: the filter key, then the page order, then rating
+    await db.testimonials.create_index([("approved", 1), ("breedKey", 1), ("createdAt", -1), ("id", -1), ("rating", 1)])
+    await db.testimonials.create_index([("approved", 1), ("locationKeys", 1), ("createdAt", -1), ("id", -1), ("rating", 1)])
+    await db.testimonials.create_index(
+        [("approved", 1), ("text", "text")],
+        name=TESTIMONIAL_TEXT_INDEX,
+        default_language="portuguese"
+    )
+
+@migration(6, "Seed site content sections")
+async def seed_content_sections(db: AsyncIOMotorDatabase):
+    inserted = await seed_site_content(db)
+    logger.info(f"Seeded {inserted} site content sections")
+
+@migration(7, "Index the notification digest buffer")
+async def create_digest_indexes(db: AsyncIOMotorDatabase):
+    await db.notification_digest.create_index("createdAt")
+
+@migration(8, "Create the compressed contact request archive")
+async def create_contact_archive(db: AsyncIOMotorDatabase):
+    await create_archive_collection(db)
+    archive = db[ARCHIVE_COLLECTION]
+    # Same access paths as the hot collection, plus lookups by id for restores
+    await archive.create_index([("createdAt", -1), ("id", -1)])
+    await archive.create_index([("status", 1), ("createdAt", 1), ("id", 1)])
+    await archive.create_index("id")
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+async def current_version(db: AsyncIOMotorDatabase) -> int:
+    document = await db._meta.find_one({"_id": SCHEMA_ID}, {"version": 1})
+    return document["version"] if document else 0
+
+async def _acquire_lock(db: AsyncIOMotorDatabase, owner: str) -> bool:
+    now = datetime.utcnow()
+    lease = {"owner": owner, "expiresAt": now + timedelta(seconds=LOCK_LEASE)}
+    try:
+        await db._meta.insert_one({"_id": LOCK_ID, **lease})
+        return True
+    except DuplicateKeyError:
+        # Take over a lock whose holder died
+        taken = await db._meta.find_one_and_update(
+            {"_id": LOCK_ID, "expiresAt": {"$lt": now}},
+            {"$set": lease}
+        )
+        return taken is not None
+
+async def _release_lock(db: AsyncIOMotorDatabase, owner: str):
+    await db._meta.delete_one({"_id": LOCK_ID, "owner": owner})
+
+async def migrate(db: AsyncIOMotorDatabase) -> bool:
+    """Apply pending migrations; returns True if this process applied any
+
+    Only the worker holding the _meta lock migrates, the others wait until
+    the recorded version is current.
+    """
+    if await current_version(db) >= LATEST_VERSION:
+        logger.info(f"Database schema is up to date (version {LATEST_VERSION})")
+        return False
+
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    deadline = asyncio.get_running_loop().time() + WAIT_TIMEOUT
+    while not await _acquire_lock(db, owner):
+        await asyncio.sleep(1)
+        if await current_version(db) >= LATEST_VERSION:
+            logger.info("Database schema migrated by another worker")
+            return False
+        if asyncio.get_running_loop().time() > deadline:
+            raise RuntimeError("Timed out waiting for the schema migration lock")
+
+    try:
+        version = await current_version(db)
+        for target, description, func in MIGRATIONS:
+            if target <= version:
+                continue
+            logger.info(f"Applying migration {target}: {description}")
+            await func(db)
+
+            now = datetime.utcnow()
+            await db._meta.update_one(
+                {"_id": SCHEMA_ID},
+                {
+                    "$set": {"version": target, "updatedAt": now},
+                    "$push": {"applied": {"version": target, "description": description, "appliedAt": now}}
+                },
+                upsert=True
+            )
+            # Extend the lease so a long migration is not taken over
+            await db._meta.update_one(
+                {"_id": LOCK_ID, "owner": owner},
+                {"$set": {"expiresAt": now + timedelta(seconds=LOCK_LEASE)}}
+            )
+        logger.info(f"Database schema migrated to version {LATEST_VERSION}")
+        return True
+    finally:
+        await _release_lock(db, owner)
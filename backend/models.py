@@ -31,6 +31,8 @@ class TestimonialResponse(BaseModel):
     breed: str
 
 # Contact Request Models
+CONTACT_STATUSES = ("pending", "contacted", "scheduled", "completed")
+
 class ContactRequestBase(BaseModel):
     name: str
     email: EmailStr
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+from metrics import mongo_command_duration
+
+class _ServerPoolStats:
+    __slots__ = (
+        "created", "closed", "checked_out", "checkouts", "checkout_failures",
+        "wait_total", "wait_max", "waits", "cleared", "last_cleared"
+    )
+
+    def __init__(self):
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.waits: deque = deque(maxlen=1024)
+        self.cleared = 0
+        self.last_cleared = None
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """CMAP listener tracking connection pool saturation per server
+
+    Check-out start and completion happen on the same driver thread, so the
+    wait for a connection is timed with a thread-local start mark.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._servers: Dict[str, _ServerPoolStats] = {}
+
+    def _stats(self, address) -> _ServerPoolStats:
+        key = f"{address[0]}:{address[1]}"
+        stats = self._servers.get(key)
+        if stats is None:
+            stats = self._servers.setdefault(key, _ServerPoolStats())
+        return stats
+
+    def pool_created(self, event):
+        self._stats(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            stats = self._stats(event.address)
+            stats.cleared += 1
+            stats.last_cleared = time.time()
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self._stats(event.address).created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._stats(event.address).closed += 1
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._stats(event.address).checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        wait = time.perf_counter() - started if started is not None else 0.0
+        with self._lock:
+            stats = self._stats(event.address)
+            stats.checked_out += 1
+            stats.checkouts += 1
+            stats.wait_total += wait
+            stats.wait_max = max(stats.wait_max, wait)
+            stats.waits.append(wait)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._stats(event.address).checked_out -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current pool figures per server, wait times in milliseconds"""
+        with self._lock:
+            result = {}
+            for server, stats in self._servers.items():
+                waits = sorted(stats.waits)
+                result[server] = {
+                    "open_connections": stats.created - stats.closed,
+                    "checked_out": stats.checked_out,
+                    "checkouts": stats.checkouts,
+                    "checkout_failures": stats.checkout_failures,
+                    "wait_ms_avg": stats.wait_total / stats.checkouts * 1000 if stats.checkouts else 0.0,
+                    "wait_ms_p99_recent": waits[int(len(waits) * 0.99)] * 1000 if waits else 0.0,
+                    "wait_ms_max": stats.wait_max * 1000,
+                    "pool_cleared": stats.cleared,
+                    "last_cleared": stats.last_cleared
+                }
+            return result
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Command listener feeding per-collection command latencies into metrics
+
+    The collection is only known from the started event, so it is kept by
+    request id until the command finishes. Dict set and pop are atomic, so the
+    driver threads need no lock.
+    """
+
+    def __init__(self):
+        self._collections: Dict[Any, str] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        self._collections[(event.connection_id, event.request_id)] = target if isinstance(target, str) else "-"
+
+    def _record(self, event, outcome: str):
+        collection = self._collections.pop((event.connection_id, event.request_id), "-")
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name, outcome)
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+# Create global instances
+pool_listener = PoolMetricsListener()
+command_listener = CommandMetricsListener()
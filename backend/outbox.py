@@ -0,0 +1,266 @@
+import asyncio
+import os
+import random
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+
+from database import get_database
+from email_service import email_service, CONTACT_NOTIFICATION, CONFIRMATION_EMAIL, DIGEST_NOTIFICATION
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Outbox item statuses
+PENDING = "pending"
+SENDING = "sending"
+DONE = "done"
+FAILED = "failed"
+
+# Transactions need a replica set or sharded cluster; "auto" detects one
+OUTBOX_TRANSACTIONS = os.getenv('OUTBOX_TRANSACTIONS', 'auto').lower()
+
+_transactions_supported: Optional[bool] = None
+
+async def _server_supports_transactions(db: AsyncIOMotorDatabase) -> bool:
+    try:
+        try:
+            reply = await db.command("hello")
+        except OperationFailure:
+            # Servers before 4.4.2 only know the legacy name
+            reply = await db.command("isMaster")
+    except Exception as e:
+        logger.warning(f"Could not detect the MongoDB topology: {str(e)}")
+        return False
+    return bool(reply.get("setName")) or reply.get("msg") == "isdbgrid"
+
+async def transactions_enabled(db: AsyncIOMotorDatabase) -> bool:
+    """Whether writes paired with outbox items run in one transaction"""
+    global _transactions_supported
+    if OUTBOX_TRANSACTIONS != "auto":
+        return OUTBOX_TRANSACTIONS == "true"
+    if _transactions_supported is None:
+        _transactions_supported = await _server_supports_transactions(db)
+        if not _transactions_supported:
+            logger.warning(
+                "MongoDB does not support transactions (standalone server); "
+                "contact requests and their outbox emails are written separately"
+            )
+    return _transactions_supported
+
+async def run_outbox_transaction(db: AsyncIOMotorDatabase, work: Callable[[Any], Awaitable[T]]) -> T:
+    """Run work(session) in a transaction, or work(None) when transactions are unavailable
+    
+    The driver retries the whole callback on transient errors and unknown
+    commit results, so work must only touch the database through the session.
+    """
+    if not await transactions_enabled(db):
+        return await work(None)
+    
+    async with await db.client.start_session() as session:
+        result = await session.with_transaction(work)
+    
+    # Items are only visible to the workers once committed
+    outbox_workers.notify()
+    return result
+
+def _new_item(messages: List[str], payload: Dict[str, Any], **fields) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    return {
+        "_id": str(uuid.uuid4()),
+        **fields,
+        "payload": payload,
+        "messages": messages,
+        "sent": [],
+        "status": PENDING,
+        "attempts": 0,
+        "nextAttemptAt": now,
+        "createdAt": now,
+        "updatedAt": now
+    }
+
+async def enqueue_contact_emails(
+    db: AsyncIOMotorDatabase,
+    contact_id: str,
+    contact_data: Dict[str, Any],
+    kinds: Optional[List[str]] = None,
+    session=None
+) -> str:
+    """Write an outbox item for the emails of one contact request
+
+    Pass the same ``session`` used for the contact insert to make both writes
+    part of one transaction.
+    """
+    item = _new_item(kinds or [CONTACT_NOTIFICATION, CONFIRMATION_EMAIL], contact_data, contactId=contact_id)
+    await db.email_outbox.insert_one(item, session=session)
+    if session is None:
+        outbox_workers.notify()
+    return item["_id"]
+
+async def enqueue_digest_email(
+    db: AsyncIOMotorDatabase,
+    contact_ids: List[str],
+    leads: List[Dict[str, Any]],
+    session=None
+) -> str:
+    """Write an outbox item for one digest notification covering ``leads``"""
+    item = _new_item([DIGEST_NOTIFICATION], {"leads": leads}, contactIds=contact_ids)
+    await db.email_outbox.insert_one(item, session=session)
+    if session is None:
+        outbox_workers.notify()
+    return item["_id"]
+
+async def get_outbox_stats(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """Outbox depth by status and how far behind delivery is"""
+    counts = {PENDING: 0, SENDING: 0, DONE: 0, FAILED: 0}
+    async for row in db.email_outbox.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+        counts[row["_id"]] = row["count"]
+
+    oldest = await db.email_outbox.find_one(
+        {"status": {"$in": [PENDING, SENDING]}},
+        projection={"createdAt": 1},
+        sort=[("createdAt", 1)]
+    )
+    oldest_age = (datetime.utcnow() - oldest["createdAt"]).total_seconds() if oldest else 0.0
+
+    return {
+        "depth": counts[PENDING] + counts[SENDING],
+        "by_status": counts,
+        "oldest_pending_seconds": oldest_age,
+        "workers": outbox_workers.stats()
+    }
+
+class OutboxWorkerPool:
+    """Background workers that drain the email outbox
+
+    Each worker claims one due item at a time with an atomic
+    find-and-modify, so any number of workers (and processes) can share the
+    collection. Failed sends are retried with exponential backoff and jitter;
+    items whose lease expires (e.g. the process died mid-send) are reclaimed.
+    """
+
+    def __init__(self):
+        self.concurrency = int(os.getenv('OUTBOX_WORKERS', '2'))
+        self.poll_interval = float(os.getenv('OUTBOX_POLL_INTERVAL', '5'))
+        self.max_attempts = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '8'))
+        self.backoff_base = float(os.getenv('OUTBOX_BACKOFF_BASE', '30'))
+        self.backoff_max = float(os.getenv('OUTBOX_BACKOFF_MAX', '3600'))
+        self.lease = float(os.getenv('OUTBOX_LEASE', '300'))
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.last_lag_seconds: Optional[float] = None
+
+    def start(self):
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"outbox-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"Started {self.concurrency} outbox workers")
+
+    async def stop(self):
+        """Let in-flight sends finish, then stop the workers"""
+        self._stopping = True
+        if self._wakeup:
+            self._wakeup.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers so a new item is sent without waiting for the next poll"""
+        if self._wakeup:
+            self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "last_lag_seconds": self.last_lag_seconds
+        }
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _claim(self, db: AsyncIOMotorDatabase) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await db.email_outbox.find_one_and_update(
+            {"$or": [
+                {"status": PENDING, "nextAttemptAt": {"$lte": now}},
+                {"status": SENDING, "leaseExpiresAt": {"$lte": now}}
+            ]},
+            {
+                "$set": {
+                    "status": SENDING,
+                    "leaseExpiresAt": now + timedelta(seconds=self.lease),
+                    "updatedAt": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("nextAttemptAt", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _process(self, db: AsyncIOMotorDatabase, item: Dict[str, Any]):
+        results = await email_service.send_messages(item["messages"], item["payload"])
+        sent = [kind for kind, ok in results.items() if ok]
+        remaining = [kind for kind, ok in results.items() if not ok]
+        now = datetime.utcnow()
+
+        update: Dict[str, Any] = {"messages": remaining, "updatedAt": now}
+        if not remaining:
+            update.update(status=DONE, sentAt=now)
+            self.sent += 1
+            self.last_lag_seconds = (now - item["createdAt"]).total_seconds()
+        elif item["attempts"] >= self.max_attempts:
+            update["status"] = FAILED
+            self.failed += 1
+            logger.error(f"Giving up on outbox item {item['_id']} after {item['attempts']} attempts")
+        else:
+            delay = self._backoff(item["attempts"])
+            update.update(status=PENDING, nextAttemptAt=now + timedelta(seconds=delay))
+            self.retried += 1
+            logger.warning(f"Outbox item {item['_id']} failed ({', '.join(remaining)}), retrying in {delay:.0f}s")
+
+        # Only the worker holding the lease may settle the item
+        await db.email_outbox.update_one(
+            {"_id": item["_id"], "leaseExpiresAt": item["leaseExpiresAt"]},
+            {"$set": update, "$push": {"sent": {"$each": sent}}}
+        )
+
+    async def _run(self):
+        while not self._stopping:
+            # Cleared before claiming so a notify() during the claim is not lost
+            self._wakeup.clear()
+            try:
+                db = get_database()
+                item = await self._claim(db)
+                if item is not None:
+                    await self._process(db, item)
+                    continue
+            except Exception as e:
+                logger.error(f"Outbox worker error: {str(e)}")
+
+            # Nothing due: sleep until notified or the next poll
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+# Create global instance
+outbox_workers = OutboxWorkerPool()
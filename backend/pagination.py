@@ -0,0 +1,169 @@
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from serialization import FastJSONResponse
+
+# The frontend loads the list without a limit and expects everything the
+# pre-pagination endpoints returned (up to 100), so that stays the default
+DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', '100'))
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '100'))
+
+# Header carrying the continuation token; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Newest first, id breaks ties between equal timestamps
+KEYSET_SORT = [("createdAt", -1), ("id", -1)]
+
+def encode_cursor(document: Dict[str, Any]) -> str:
+    """Opaque token pointing just after ``document`` in KEYSET_SORT order"""
+    created_at = document["createdAt"]
+    if isinstance(created_at, datetime):
+        key = ["d", created_at.isoformat(), document["id"]]
+    else:
+        # Legacy documents store createdAt as an ISO string
+        key = ["s", str(created_at), document["id"]]
+    raw = json.dumps(key, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[Any, str]:
+    """Return the (createdAt, id) position encoded in a cursor token"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        kind, created_at, doc_id = json.loads(raw)
+        if kind == "d":
+            return datetime.fromisoformat(created_at), str(doc_id)
+        if kind == "s":
+            return str(created_at), str(doc_id)
+    except (binascii.Error, ValueError, TypeError):
+        pass
+    raise HTTPException(status_code=400, detail="Cursor inválido")
+
+def keyset_filter(token: str) -> Dict[str, Any]:
+    """Query matching every document after the cursor position"""
+    created_at, doc_id = decode_cursor(token)
+    clauses: List[Dict[str, Any]] = [
+        {"createdAt": {"$lt": created_at}},
+        {"createdAt": created_at, "id": {"$lt": doc_id}}
+    ]
+    if isinstance(created_at, datetime):
+        # Strings sort below dates, so legacy string timestamps come after every date
+        clauses.append({"createdAt": {"$type": "string"}})
+    return {"$or": clauses}
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    projection: Optional[Dict[str, Any]],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Fetch one keyset page and the cursor for the next one
+
+    Every page costs one indexed range scan of ``limit + 1`` documents, no
+    matter how deep it is.
+    """
+    if cursor:
+        query = {"$and": [query, keyset_filter(cursor)]}
+
+    # The sort key is needed to build the next cursor even if not returned
+    fields = dict(projection) if projection is not None else None
+    strip_sort_key = fields is not None and "createdAt" not in fields and any(
+        value for key, value in fields.items() if key != "_id"
+    )
+    if strip_sort_key:
+        fields["createdAt"] = 1
+        fields["id"] = 1
+
+    documents = await collection.find(query, fields).sort(KEYSET_SORT).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1])
+
+    if strip_sort_key:
+        for document in documents:
+            document.pop("createdAt", None)
+    return documents, next_cursor
+
+def _keyset_position(document: Dict[str, Any]) -> Tuple[int, Any, str]:
+    # Mirrors KEYSET_SORT, with legacy string timestamps after every date
+    created_at = document["createdAt"]
+    if isinstance(created_at, datetime):
+        return 1, created_at, document["id"]
+    return 0, str(created_at), document["id"]
+
+async def fetch_merged_page(
+    collections: List[Any],
+    query: Dict[str, Any],
+    projection: Optional[Dict[str, Any]],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Fetch one keyset page across several collections sharing KEYSET_SORT
+
+    Each collection is read from the same cursor position and the results
+    are merged, so the cursor stays valid for every collection. The
+    projection must keep createdAt and id.
+    """
+    documents: List[Dict[str, Any]] = []
+    more = False
+    for collection in collections:
+        page, next_cursor = await fetch_page(collection, query, projection, cursor, limit)
+        documents.extend(page)
+        more = more or next_cursor is not None
+
+    documents.sort(key=_keyset_position, reverse=True)
+    if len(documents) > limit:
+        documents = documents[:limit]
+        more = True
+    return documents, encode_cursor(documents[-1]) if more else None
+
+def encode_offset_cursor(offset: int) -> str:
+    raw = json.dumps(["o", offset], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_offset_cursor(token: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        kind, offset = json.loads(raw)
+        if kind == "o" and isinstance(offset, int) and offset >= 0:
+            return offset
+    except (binascii.Error, ValueError, TypeError):
+        pass
+    raise HTTPException(status_code=400, detail="Cursor inválido")
+
+async def fetch_ranked_page(
+    collection,
+    query: Dict[str, Any],
+    projection: Optional[Dict[str, Any]],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Fetch one page of $text results, best match first
+
+    Relevance has no stable key to seek on, so these cursors carry an offset.
+    Text matches are bounded by the search terms, which keeps the skip short.
+    """
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    sort = [("score", {"$meta": "textScore"}), *KEYSET_SORT]
+    documents = await collection.find(query, projection).sort(sort).skip(offset).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_offset_cursor(offset + limit)
+    return documents, next_cursor
+
+def page_headers(next_cursor: Optional[str]) -> Dict[str, str]:
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+def page_response(items: List[Dict[str, Any]], next_cursor: Optional[str]) -> FastJSONResponse:
+    """JSON array response with the continuation token in a header"""
+    return FastJSONResponse(items, headers=page_headers(next_cursor))
@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Request"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Shared secret for signed profiling requests; unset disables the header trigger
+PROFILE_SECRET = os.getenv('PROFILE_SECRET', '')
+# Fraction of requests profiled without a header, 0 disables sampling
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+# Seconds between stack samples
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', '0.001'))
+# Profiles are kept this long; also the TTL of the request_profiles collection
+PROFILE_RETENTION = int(os.getenv('PROFILE_RETENTION', str(7 * 24 * 3600)))
+# Signed headers older than this are refused
+SIGNATURE_MAX_AGE = 300
+
+def sign_profile_request(secret: str, method: str, path: str, timestamp: Optional[int] = None) -> str:
+    """Header value asking the server to profile one request to ``path``"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    message = f"{timestamp}:{method.upper()}:{path}".encode("utf-8")
+    signature = hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+    return f"{timestamp}.{signature}"
+
+def verify_profile_request(secret: str, method: str, path: str, value: str) -> bool:
+    timestamp, _, _ = value.partition(".")
+    try:
+        issued = int(timestamp)
+    except ValueError:
+        return False
+    if abs(time.time() - issued) > SIGNATURE_MAX_AGE:
+        return False
+    return hmac.compare_digest(value, sign_profile_request(secret, method, path, issued))
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _thread_stack(frame) -> List[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+def _awaiting_stack(task: asyncio.Task) -> List[str]:
+    """Where a suspended task is waiting, following the chain of awaits"""
+    stack = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "ag_frame", None)
+        if frame is None:
+            stack.append(f"[awaiting {type(awaitable).__name__}]")
+            break
+        stack.append(_frame_label(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "ag_await", None)
+    return stack
+
+class StackSampler:
+    """Samples the stack of one request task from a background thread
+
+    While the task runs on the event loop the loop thread's stack is
+    recorded; while it is suspended, the chain of awaits it is blocked on
+    (Mongo, SMTP, locks) is recorded instead, so waiting shows up too.
+    """
+
+    def __init__(self, task: asyncio.Task, loop: asyncio.AbstractEventLoop, interval: float = PROFILE_INTERVAL):
+        self.task = task
+        self.loop = loop
+        self.interval = interval
+        self.loop_thread = threading.get_ident()
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if asyncio.current_task(self.loop) is self.task:
+                    frame = sys._current_frames().get(self.loop_thread)
+                    stack = _thread_stack(frame) if frame is not None else []
+                else:
+                    stack = ["[suspended]"] + _awaiting_stack(self.task)
+            except Exception:
+                # The task moved on while its frames were being read
+                continue
+            if stack:
+                self.samples[";".join(stack)] += 1
+
+    def folded(self) -> str:
+        """Folded stacks, the input format of flamegraph.pl and speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+class ProfilingMiddleware:
+    """Opt-in per-request sampling profiler
+
+    A request is profiled when it carries a valid signed PROFILE_HEADER or is
+    picked by PROFILE_SAMPLE_RATE. Untriggered requests only pay for the
+    header lookup. Profiles are saved to the request_profiles collection and
+    the response carries their id.
+    """
+
+    def __init__(self, app, get_db: Callable[[], AsyncIOMotorDatabase]):
+        self.app = app
+        self.get_db = get_db
+        # One profile at a time, concurrent triggers are served unprofiled
+        self._busy = threading.Lock()
+
+    def _triggered(self, scope) -> bool:
+        if PROFILE_SECRET:
+            for name, value in scope.get("headers", []):
+                if name == b"x-profile-request":
+                    return verify_profile_request(PROFILE_SECRET, scope["method"], scope["path"], value.decode("latin-1"))
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._triggered(scope):
+            return await self.app(scope, receive, send)
+        if not self._busy.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        try:
+            profile_id = str(uuid.uuid4())
+            status = 500
+
+            async def send_wrapper(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER.lower().encode(), profile_id.encode())]
+                await send(message)
+
+            sampler = StackSampler(asyncio.current_task(), asyncio.get_running_loop())
+            started = time.perf_counter()
+            sampler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                sampler.stop()
+                duration = time.perf_counter() - started
+        finally:
+            self._busy.release()
+
+        profile = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "durationMs": round(duration * 1000, 3),
+            "intervalMs": sampler.interval * 1000,
+            "samples": sum(sampler.samples.values()),
+            "folded": sampler.folded(),
+            "createdAt": datetime.utcnow()
+        }
+        try:
+            await self.get_db().request_profiles.insert_one(profile)
+            logger.info(f"Saved profile {profile_id} for {scope['method']} {scope['path']} ({profile['durationMs']} ms)")
+        except Exception as e:
+            logger.error(f"Failed to save request profile: {str(e)}")
+
+if __name__ == "__main__":
+    # Print a header for one profiled request, e.g.
+    #   curl -H "$(python profiling.py POST /api/contact/schedule)" ...
+    if len(sys.argv) != 3 or not PROFILE_SECRET:
+        sys.exit("usage: PROFILE_SECRET=... python profiling.py METHOD PATH")
+    print(f"{PROFILE_HEADER}: {sign_profile_request(PROFILE_SECRET, sys.argv[1], sys.argv[2])}")
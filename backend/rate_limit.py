@@ -0,0 +1,201 @@
+import math
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Classic token bucket: ``capacity`` burst, refilled at ``rate`` tokens per second"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def wait(self, now: float) -> float:
+        """Refill; returns 0 if a token is available, else seconds until one is"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+    def take(self, now: float) -> float:
+        """Consume a token; returns 0 on success, else seconds until one is available"""
+        wait = self.wait(now)
+        if not wait:
+            self.consume()
+        return wait
+
+def parse_limit(value: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Parse "count/seconds" into (rate, burst); "off" or "0" disables the limit"""
+    if not value or value.strip().lower() in ("off", "0"):
+        return None
+    count, _, seconds = value.partition("/")
+    try:
+        count, seconds = float(count), float(seconds or 1)
+    except ValueError:
+        raise ValueError(f"Invalid rate limit {value!r}, expected \"count/seconds\" or \"off\"")
+    if count <= 0 or seconds <= 0:
+        raise ValueError(f"Invalid rate limit {value!r}, count and seconds must be positive; use \"off\" to disable it")
+    return count / seconds, count
+
+class RouteLimit:
+    """Per-client and global buckets for one write route"""
+
+    def __init__(self, name: str, per_client: Optional[Tuple[float, float]], overall: Optional[Tuple[float, float]]):
+        self.name = name
+        self.per_client = per_client
+        self.overall = TokenBucket(*overall) if overall else None
+
+class RateLimiter:
+    """Token-bucket rate limits and an in-flight cap for write endpoints
+
+    Keyed by (method, path). Client buckets are kept in a bounded LRU so a
+    flood of distinct addresses cannot grow memory without limit.
+    """
+
+    def __init__(self, routes: Dict[Tuple[str, str], RouteLimit], max_inflight: int, max_clients: int = 10000, trust_forwarded: bool = False):
+        self.routes = routes
+        self.max_inflight = max_inflight
+        self.max_clients = max_clients
+        self.trust_forwarded = trust_forwarded
+
+        self.inflight = 0
+        self._clients: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self.rejected: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        routes = {
+            ("POST", "/api/contact/schedule"): RouteLimit(
+                "contact_schedule",
+                parse_limit(os.getenv('RATE_LIMIT_CONTACT_PER_IP', '5/60')),
+                parse_limit(os.getenv('RATE_LIMIT_CONTACT_GLOBAL', '120/60'))
+            ),
+            ("POST", "/api/testimonials/"): RouteLimit(
+                "testimonial_create",
+                parse_limit(os.getenv('RATE_LIMIT_TESTIMONIAL_PER_IP', '3/300')),
+                parse_limit(os.getenv('RATE_LIMIT_TESTIMONIAL_GLOBAL', '60/60'))
+            )
+        }
+        return cls(
+            routes,
+            max_inflight=int(os.getenv('MAX_INFLIGHT_WRITES', '32')),
+            trust_forwarded=os.getenv('RATE_LIMIT_TRUST_FORWARDED', 'false').lower() == 'true'
+        )
+
+    def client_ip(self, scope) -> str:
+        if self.trust_forwarded:
+            for name, value in scope.get("headers", []):
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _client_bucket(self, route: RouteLimit, ip: str) -> TokenBucket:
+        key = (route.name, ip)
+        bucket = self._clients.get(key)
+        if bucket is None:
+            bucket = TokenBucket(*route.per_client)
+            self._clients[key] = bucket
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(key)
+        return bucket
+
+    def _reject(self, route: RouteLimit, reason: str):
+        key = f"{route.name}:{reason}"
+        self.rejected[key] = self.rejected.get(key, 0) + 1
+
+    def check(self, route: RouteLimit, scope) -> Optional[Tuple[int, float, str]]:
+        """Return (status, retry_after, reason) when the request must be rejected"""
+        if self.inflight >= self.max_inflight:
+            self._reject(route, "shed")
+            return 503, 1.0, "shed"
+
+        # Check both buckets before taking from either, so a request turned
+        # away by the global limit is not charged to the client
+        now = time.monotonic()
+        client = self._client_bucket(route, self.client_ip(scope)) if route.per_client else None
+        if client:
+            wait = client.wait(now)
+            if wait:
+                self._reject(route, "client")
+                return 429, wait, "client"
+        if route.overall:
+            wait = route.overall.wait(now)
+            if wait:
+                self._reject(route, "global")
+                return 429, wait, "global"
+            route.overall.consume()
+        if client:
+            client.consume()
+        return None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "tracked_clients": len(self._clients),
+            "rejected": dict(self.rejected)
+        }
+
+REJECTION_MESSAGES = {
+    429: "Muitas solicitações. Tente novamente em instantes.",
+    503: "Servidor ocupado. Tente novamente em instantes."
+}
+
+class RateLimitMiddleware:
+    """ASGI middleware answering over-limit writes with a fast 429/503"""
+
+    def __init__(self, app, limiter: "RateLimiter"):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # Exact match: a slash redirect is cheap and only its target is counted
+        route = self.limiter.routes.get((scope["method"], scope["path"]))
+        if route is None:
+            return await self.app(scope, receive, send)
+
+        rejection = self.limiter.check(route, scope)
+        if rejection is not None:
+            status, retry_after, reason = rejection
+            logger.debug(f"Rejected {route.name} request ({reason})")
+            body = dumps({"detail": REJECTION_MESSAGES[status]})
+            await send({
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, math.ceil(retry_after))).encode())
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        self.limiter.inflight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.inflight -= 1
+
+# Create global instance
+rate_limiter = RateLimiter.from_env()
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import PlainTextResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from rate_limit import rate_limiter
+from database import get_database, get_pool_options
+from mongo_monitoring import pool_listener
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/rate-limit")
+async def get_rate_limit_stats():
+    """Get in-flight write requests and rejection counters"""
+    return rate_limiter.stats()
+
+@router.get("/mongo-pool")
+async def get_mongo_pool_stats():
+    """Get MongoDB pool settings and live connection pool metrics"""
+    return {
+        "options": get_pool_options(),
+        "servers": pool_listener.snapshot()
+    }
+
+@router.get("/profiles")
+async def get_request_profiles(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """List recent request profiles, newest first"""
+    try:
+        profiles = await db.request_profiles.find(
+            {}, {"_id": 0, "folded": 0}
+        ).sort("createdAt", -1).limit(limit).to_list(limit)
+        
+        return profiles
+        
+    except Exception as e:
+        logger.error(f"Error fetching request profiles: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erro ao buscar perfis")
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(
+    profile_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Download a request profile as folded stacks for flamegraph tools"""
+    try:
+        profile = await db.request_profiles.find_one({"id": profile_id}, {"_id": 0, "folded": 1})
+        
+        if not profile:
+            raise HTTPException(status_code=404, detail="Perfil não encontrado")
+        
+        return PlainTextResponse(
+            profile["folded"],
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching request profile: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erro ao buscar perfil")
@@ -1,8 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Header
+from fastapi.responses import StreamingResponse
+from typing import Optional, Literal
+from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from models import ContactRequestCreate, ContactRequest, ContactResponse
+from models import ContactRequestCreate, ContactRequest, ContactResponse, AdminContactUpdate, CONTACT_STATUSES
 from database import get_database
-from email_service import email_service
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page, fetch_merged_page, page_response
+from export import build_export_query, iter_batches, chain_batches, ndjson_chunks, csv_chunks
+from counters import DEFAULT_CONTACT_STATUS, record_contact_created, record_contact_status_change, get_contact_counters, reconcile_contact_counters
+from pymongo import ReturnDocument
+import idempotency
+from outbox import run_outbox_transaction, get_outbox_stats
+from digest import enqueue_lead_emails, get_digest_stats, digest_flusher
+from archive import ARCHIVE_COLLECTION, archive_contact_requests, restore_contact_request, get_archive_stats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,72 +22,264 @@ router = APIRouter(prefix="/contact", tags=["contact"])
 @router.post("/schedule", response_model=ContactResponse)
 async def schedule_appointment(
     contact: ContactRequestCreate,
+    idempotency_key: Optional[str] = Header(None, alias=idempotency.IDEMPOTENCY_HEADER),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """Process contact form and schedule appointment"""
+    # Retries and double submits are answered once, without new inserts or emails
+    if idempotency_key:
+        key = idempotency.header_key("contact", idempotency_key)
+    else:
+        key = idempotency.contact_fingerprint(contact.email, contact.phone, contact.dogName)
+    
+    try:
+        previous = await idempotency.claim(db, key)
+        if previous is not None:
+            response = previous.get("response") or await idempotency.wait_for_response(db, key)
+            if response is None:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Sua solicitação já está sendo processada."
+                )
+            logger.info(f"Duplicate contact submission suppressed for {contact.email}")
+            return ContactResponse(**response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Never lose a lead because the duplicate check failed
+        logger.warning(f"Idempotency check failed, processing anyway: {str(e)}")
+        key = None
+    
     try:
         # Create contact request object
         contact_obj = ContactRequest(**contact.dict())
         
-        # Save to database
-        await db.contact_requests.insert_one(contact_obj.dict())
-        logger.info(f"Contact request saved for {contact.email}")
-        
-        # Send email notifications
-        contact_data = contact.dict()
-        
-        # Send notification to business
-        notification_sent = email_service.send_contact_notification(contact_data)
+        # Save to database, queueing the emails for the outbox workers
+        async def save_contact(session):
+            await db.contact_requests.insert_one(contact_obj.dict(), session=session)
+            await enqueue_lead_emails(db, contact_obj.id, contact.dict(), session=session)
         
-        # Send confirmation to client
-        confirmation_sent = email_service.send_confirmation_email(contact_data)
-        
-        if notification_sent and confirmation_sent:
-            success_message = "Solicitação enviada com sucesso! Entraremos em contato em até 24 horas."
-        elif notification_sent:
-            success_message = "Solicitação enviada com sucesso! Entraremos em contato em até 24 horas."
-        else:
-            # Even if email fails, we still saved the contact request
-            success_message = "Solicitação recebida! Entraremos em contato em até 24 horas."
-            logger.warning(f"Email sending failed for contact request {contact.email}")
+        await run_outbox_transaction(db, save_contact)
+        logger.info(f"Contact request saved for {contact.email}")
         
-        return ContactResponse(
-            success=True,
-            message=success_message
-        )
+        try:
+            await record_contact_created(db, contact_obj.status)
+        except Exception as e:
+            # The lead is saved; the next reconciliation fixes the counters
+            logger.warning(f"Could not update contact counters: {str(e)}")
         
     except Exception as e:
         logger.error(f"Error processing contact request: {str(e)}")
+        if key:
+            # The submission failed, so let the client retry with the same key
+            try:
+                await idempotency.release(db, key)
+            except Exception as release_error:
+                logger.warning(f"Could not release idempotency key: {str(release_error)}")
         raise HTTPException(
             status_code=500, 
             detail="Erro interno. Tente novamente ou entre em contato diretamente."
         )
+    
+    response = ContactResponse(
+        success=True,
+        message="Solicitação enviada com sucesso! Entraremos em contato em até 24 horas."
+    )
+    if key:
+        # The lead is saved; keep the key claimed even if caching the response
+        # fails, so a retry is refused instead of creating a duplicate
+        try:
+            await idempotency.store_response(db, key, response.dict())
+        except Exception as e:
+            logger.warning(f"Could not store idempotent response: {str(e)}")
+    return response
 
 @router.get("/admin/requests")
-async def get_contact_requests(db: AsyncIOMotorDatabase = Depends(get_database)):
-    """Get all contact requests for admin (future use)"""
+async def get_contact_requests(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get contact requests for admin, newest first, one page at a time"""
     try:
-        requests = await db.contact_requests.find().sort("createdAt", -1).to_list(100)
-        return requests
+        if include_archived:
+            # Archived leads carry an archivedAt field
+            collections = [db.contact_requests, db[ARCHIVE_COLLECTION]]
+            requests, next_cursor = await fetch_merged_page(collections, {}, {"_id": 0}, cursor, limit)
+        else:
+            requests, next_cursor = await fetch_page(db.contact_requests, {}, {"_id": 0}, cursor, limit)
+        return page_response(requests, next_cursor)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving contact requests: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/admin/export")
+async def export_contact_requests(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_archived: bool = False,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Stream every matching contact request as NDJSON or CSV"""
+    query = build_export_query(status, since, until)
+    if include_archived:
+        # Archived leads first, then the hot collection, each oldest first
+        batches = chain_batches(iter_batches(db[ARCHIVE_COLLECTION], query), iter_batches(db.contact_requests, query))
+    else:
+        batches = iter_batches(db.contact_requests, query)
+    
+    if format == "csv":
+        chunks, media_type = csv_chunks(batches), "text/csv; charset=utf-8"
+    else:
+        chunks, media_type = ndjson_chunks(batches), "application/x-ndjson"
+    
+    filename = f"contact_requests_{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    logger.info(f"Exporting contact requests as {format}")
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.put("/admin/requests/{request_id}")
+async def update_contact_request(
+    request_id: str,
+    update: AdminContactUpdate,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Update the status or notes of a contact request"""
+    try:
+        if update.status is not None and update.status not in CONTACT_STATUSES:
+            raise HTTPException(status_code=400, detail="Status inválido")
+        
+        changes = update.dict(exclude_none=True)
+        changes["updatedAt"] = datetime.utcnow()
+        
+        previous = await db.contact_requests.find_one_and_update(
+            {"id": request_id},
+            {"$set": changes},
+            projection={"status": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            raise HTTPException(status_code=404, detail="Solicitação não encontrada")
+        
+        if update.status is not None:
+            await record_contact_status_change(db, previous.get("status", DEFAULT_CONTACT_STATUS), update.status)
+        
+        return {"success": True, "message": "Solicitação atualizada"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating contact request: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.get("/admin/stats")
 async def get_contact_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
-    """Get contact statistics for admin dashboard (future use)"""
+    """Get contact statistics for admin dashboard from the maintained counters"""
     try:
-        total_requests = await db.contact_requests.count_documents({})
-        pending_requests = await db.contact_requests.count_documents({"status": "pending"})
-        completed_requests = await db.contact_requests.count_documents({"status": "completed"})
+        counters = await get_contact_counters(db)
+        by_status = {status: counters.get("by_status", {}).get(status, 0) for status in CONTACT_STATUSES}
         
         return {
-            "total_requests": total_requests,
-            "pending_requests": pending_requests,
-            "completed_requests": completed_requests
+            "total_requests": counters.get("total", 0),
+            "pending_requests": by_status["pending"],
+            "completed_requests": by_status["completed"],
+            "archived_requests": await db[ARCHIVE_COLLECTION].estimated_document_count(),
+            "by_status": by_status
         }
         
     except Exception as e:
         logger.error(f"Error retrieving contact stats: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/admin/stats/reconcile")
+async def reconcile_contact_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Recount contact requests by status and repair the counters"""
+    try:
+        counters = await reconcile_contact_counters(db)
+        return {"total_requests": counters["total"], "by_status": counters["by_status"]}
+        
+    except Exception as e:
+        logger.error(f"Error reconciling contact stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/admin/outbox")
+async def get_email_outbox_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Get email outbox depth and delivery lag for admin monitoring"""
+    try:
+        return await get_outbox_stats(db)
+        
+    except Exception as e:
+        logger.error(f"Error retrieving outbox stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/admin/digest")
+async def get_notification_digest_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Get digest mode settings and the leads waiting for the next digest"""
+    try:
+        return await get_digest_stats(db)
+        
+    except Exception as e:
+        logger.error(f"Error retrieving digest stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/admin/digest/flush")
+async def flush_notification_digest(db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Send every buffered lead in digests now"""
+    try:
+        digests = await digest_flusher.flush(db, force=True)
+        return {"success": True, "digests": digests}
+        
+    except Exception as e:
+        logger.error(f"Error flushing notification digest: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/admin/archive")
+async def get_contact_archive_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Get archive settings and the size of the hot and archived tiers"""
+    try:
+        return await get_archive_stats(db)
+        
+    except Exception as e:
+        logger.error(f"Error retrieving archive stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/admin/archive")
+async def archive_contact_requests_now(
+    older_than_days: Optional[int] = Query(None, ge=0),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Move aged contact requests to the archive now"""
+    try:
+        archived = await archive_contact_requests(db, older_than_days=older_than_days)
+        return {"success": True, "archived": archived}
+        
+    except Exception as e:
+        logger.error(f"Error archiving contact requests: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/admin/requests/{request_id}/restore")
+async def restore_archived_contact_request(
+    request_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Move an archived contact request back to the active requests"""
+    try:
+        if not await restore_contact_request(db, request_id):
+            raise HTTPException(status_code=404, detail="Solicitação arquivada não encontrada")
+        
+        return {"success": True, "message": "Solicitação restaurada"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error restoring contact request: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
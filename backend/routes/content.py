@@ -0,0 +1,85 @@
+from fastapi import APIRouter, HTTPException, Depends, Request, Body
+from typing import Any, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from database import get_database
+from cache import AsyncRefreshCache
+from http_cache import cached_response
+from content import CONTENT_SECTIONS, ContentBundle, load_content_bundle, update_section
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/content", tags=["content"])
+
+# Cache-Control for the public site content
+CONTENT_CACHE_CONTROL = os.getenv(
+    'CONTENT_CACHE_CONTROL',
+    'public, max-age=60, stale-while-revalidate=600'
+)
+
+_current_bundle: Optional[ContentBundle] = None
+
+async def load_site_content() -> ContentBundle:
+    """Check the content version; sections are only re-read when it changed"""
+    global _current_bundle
+    _current_bundle = await load_content_bundle(get_database(), _current_bundle)
+    return _current_bundle
+
+site_content_cache = AsyncRefreshCache(
+    "site content",
+    load_site_content,
+    ttl=float(os.getenv('CONTENT_CACHE_TTL', '30'))
+)
+
+@router.get("/")
+async def get_site_content(request: Request):
+    """Get every site content section in one versioned bundle"""
+    try:
+        bundle = await site_content_cache.get()
+        return cached_response(request, bundle.bundle, CONTENT_CACHE_CONTROL)
+        
+    except Exception as e:
+        logger.error(f"Error retrieving site content: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/{section}")
+async def get_site_content_section(section: str, request: Request):
+    """Get a single site content section"""
+    if section not in CONTENT_SECTIONS:
+        raise HTTPException(status_code=404, detail="Seção não encontrada")
+    
+    try:
+        bundle = await site_content_cache.get()
+        representation = bundle.sections.get(section)
+        
+    except Exception as e:
+        logger.error(f"Error retrieving site content section {section}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    if representation is None:
+        raise HTTPException(status_code=404, detail="Seção não encontrada")
+    return cached_response(request, representation, CONTENT_CACHE_CONTROL)
+
+@router.put("/admin/{section}", response_model=dict)
+async def update_site_content_section(
+    section: str,
+    data: Any = Body(...),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Replace a site content section (admin only)"""
+    if section not in CONTENT_SECTIONS:
+        raise HTTPException(status_code=404, detail="Seção não encontrada")
+    if data is None:
+        raise HTTPException(status_code=400, detail="Conteúdo inválido")
+    
+    try:
+        version = await update_section(db, section, data)
+        site_content_cache.invalidate()
+        
+        logger.info(f"Site content section {section} updated to version {version}")
+        return {"success": True, "message": "Conteúdo atualizado com sucesso", "version": version}
+        
+    except Exception as e:
+        logger.error(f"Error updating site content section {section}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
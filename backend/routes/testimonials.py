@@ -1,40 +1,101 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from models import Testimonial, TestimonialCreate, TestimonialResponse
+from models import Testimonial, TestimonialCreate, TestimonialResponse, AdminTestimonialUpdate
 from database import get_database
+from cache import AsyncRefreshCache
+from http_cache import CachedRepresentation, cached_response
+from serialization import dumps
+from counters import record_testimonial_approval, rebuild_testimonial_summary, get_testimonial_summary
+from pymongo import ReturnDocument
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page, fetch_ranked_page, page_headers, page_response
+from search import build_testimonial_query, testimonial_search_keys
+from datetime import datetime
+import os
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/testimonials", tags=["testimonials"])
 
+# Only the response fields travel over the wire, _id excluded
+TESTIMONIAL_PROJECTION = {"_id": 0, **{field: 1 for field in TestimonialResponse.model_fields}}
+
+# Cache-Control for the public testimonials list
+TESTIMONIALS_CACHE_CONTROL = os.getenv(
+    'TESTIMONIALS_CACHE_CONTROL',
+    'public, max-age=60, stale-while-revalidate=300'
+)
+
+async def load_approved_testimonials() -> CachedRepresentation:
+    """Load the first page of approved testimonials and serialize it once"""
+    db = get_database()
+    # Served newest first straight from the {approved, createdAt, id} index
+    testimonials, next_cursor = await fetch_page(
+        db.testimonials, {"approved": True}, TESTIMONIAL_PROJECTION, None, DEFAULT_PAGE_SIZE
+    )
+    
+    # Documents are validated on write and projected to the response shape
+    logger.info(f"Loaded {len(testimonials)} approved testimonials")
+    return CachedRepresentation(dumps(testimonials), headers=page_headers(next_cursor))
+
+approved_testimonials_cache = AsyncRefreshCache(
+    "approved testimonials",
+    load_approved_testimonials,
+    ttl=float(os.getenv('TESTIMONIALS_CACHE_TTL', '60'))
+)
+
 @router.get("/", response_model=List[TestimonialResponse])
-async def get_testimonials(db: AsyncIOMotorDatabase = Depends(get_database)):
-    """Get all approved testimonials"""
+async def get_testimonials(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    breed: Optional[str] = Query(None, max_length=100),
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    location: Optional[str] = Query(None, max_length=100),
+    q: Optional[str] = Query(None, max_length=200),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get approved testimonials one page at a time
+
+    Filters by breed, minimum rating and location. With ``q`` the results
+    are ranked by text relevance, otherwise they come newest first.
+    """
     try:
-        testimonials = await db.testimonials.find({"approved": True}).to_list(100)
+        filtered = any(value for value in (breed, min_rating, location, q))
         
-        # Convert MongoDB documents to response format
-        result = []
-        for testimonial in testimonials:
-            result.append(TestimonialResponse(
-                id=testimonial["id"],
-                name=testimonial["name"],
-                location=testimonial["location"],
-                rating=testimonial["rating"],
-                text=testimonial["text"],
-                dogName=testimonial["dogName"],
-                breed=testimonial["breed"]
-            ))
+        # The landing page's first page is served from memory
+        if not filtered and cursor is None and limit == DEFAULT_PAGE_SIZE:
+            representation = await approved_testimonials_cache.get()
+            return cached_response(request, representation, TESTIMONIALS_CACHE_CONTROL)
         
-        logger.info(f"Retrieved {len(result)} testimonials")
-        return result
+        query = build_testimonial_query(breed, min_rating, location, q and q.strip())
+        if "$text" in query:
+            testimonials, next_cursor = await fetch_ranked_page(
+                db.testimonials, query, TESTIMONIAL_PROJECTION, cursor, limit
+            )
+        else:
+            testimonials, next_cursor = await fetch_page(
+                db.testimonials, query, TESTIMONIAL_PROJECTION, cursor, limit
+            )
+        return page_response(testimonials, next_cursor)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving testimonials: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/stats", response_model=dict)
+async def get_testimonial_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Get average rating, rating histogram and per-breed counts of approved testimonials"""
+    try:
+        return await get_testimonial_summary(db)
+        
+    except Exception as e:
+        logger.error(f"Error retrieving testimonial stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.post("/", response_model=dict)
 async def create_testimonial(
     testimonial: TestimonialCreate,
@@ -45,7 +106,11 @@ async def create_testimonial(
         testimonial_obj = Testimonial(**testimonial.dict())
         testimonial_obj.approved = False  # Require manual approval
         
-        await db.testimonials.insert_one(testimonial_obj.dict())
+        await db.testimonials.insert_one({
+            **testimonial_obj.dict(),
+            **testimonial_search_keys(testimonial_obj.breed, testimonial_obj.location)
+        })
+        approved_testimonials_cache.invalidate()
         
         logger.info(f"New testimonial created for {testimonial.name}")
         return {"success": True, "message": "Depoimento enviado para aprovação"}
@@ -55,12 +120,66 @@ async def create_testimonial(
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 @router.get("/admin/pending", response_model=List[dict])
-async def get_pending_testimonials(db: AsyncIOMotorDatabase = Depends(get_database)):
-    """Get all pending testimonials for admin approval (future use)"""
+async def get_pending_testimonials(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get pending testimonials for admin approval, one page at a time"""
     try:
-        testimonials = await db.testimonials.find({"approved": False}).to_list(100)
-        return testimonials
+        testimonials, next_cursor = await fetch_page(
+            db.testimonials, {"approved": False}, {"_id": 0, "breedKey": 0, "locationKeys": 0}, cursor, limit
+        )
+        return page_response(testimonials, next_cursor)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving pending testimonials: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.put("/admin/{testimonial_id}", response_model=dict)
+async def update_testimonial(
+    testimonial_id: str,
+    update: AdminTestimonialUpdate,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Approve or reject a testimonial"""
+    try:
+        changes = update.dict(exclude_none=True)
+        changes["updatedAt"] = datetime.utcnow()
+        
+        previous = await db.testimonials.find_one_and_update(
+            {"id": testimonial_id},
+            {"$set": changes},
+            projection={"approved": 1, "rating": 1, "breed": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            raise HTTPException(status_code=404, detail="Depoimento não encontrado")
+        
+        if update.approved is not None and update.approved != previous["approved"]:
+            await record_testimonial_approval(db, previous, update.approved)
+        
+        approved_testimonials_cache.invalidate()
+        
+        logger.info(f"Testimonial {testimonial_id} updated: {changes}")
+        return {"success": True, "message": "Depoimento atualizado"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating testimonial: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+
+@router.post("/admin/stats/rebuild", response_model=dict)
+async def rebuild_testimonial_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Rebuild the testimonial rating summary from scratch"""
+    try:
+        await rebuild_testimonial_summary(db)
+        return await get_testimonial_summary(db)
+        
+    except Exception as e:
+        logger.error(f"Error rebuilding testimonial stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
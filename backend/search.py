@@ -0,0 +1,48 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# Index backing free-text search, ranked with the Portuguese stemmer
+TESTIMONIAL_TEXT_INDEX = "testimonial_text"
+
+def normalize_key(value: str) -> str:
+    """Lowercase, accent-free, single-spaced form used for equality filters"""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+def location_keys(location: str) -> List[str]:
+    """Every way a visitor may name the region: "São Paulo, SP" -> city, state and both"""
+    parts = [normalize_key(part) for part in re.split(r"[,/\-]", location)]
+    keys = [part for part in parts if part]
+    whole = " ".join(keys)
+    if whole and whole not in keys:
+        keys.append(whole)
+    return keys
+
+def testimonial_search_keys(breed: str, location: str) -> Dict[str, Any]:
+    """Denormalized fields stored with each testimonial for the search indexes"""
+    return {"breedKey": normalize_key(breed), "locationKeys": location_keys(location)}
+
+def build_testimonial_query(
+    breed: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    location: Optional[str] = None,
+    q: Optional[str] = None
+) -> Dict[str, Any]:
+    """Filter over approved testimonials
+
+    Breed and location are equality matches on the normalized keys, so each
+    can use its {approved, key, createdAt, id, rating} index with no
+    in-memory sort.
+    """
+    query: Dict[str, Any] = {"approved": True}
+    if breed:
+        query["breedKey"] = normalize_key(breed)
+    if location:
+        query["locationKeys"] = normalize_key(location.replace(",", " "))
+    if min_rating:
+        query["rating"] = {"$gte": min_rating}
+    if q:
+        query["$text"] = {"$search": q}
+    return query
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Production entrypoint running the API in several worker processes
+
+The supervisor binds the listening socket once and shares it with
+WEB_CONCURRENCY uvicorn workers. One worker is elected leader and runs the
+database bootstrap and the leader-only background jobs; the others wait on
+a shared readiness flag before serving. SIGHUP replaces the workers one at
+a time, starting each replacement before stopping the worker it replaces,
+so new code is picked up without dropping the socket. SIGTERM/SIGINT stop
+everything gracefully.
+
+MONGO_TOTAL_POOL_SIZE is split evenly between the workers unless
+MONGO_MAX_POOL_SIZE sets the per-worker size explicitly.
+
+Usage (from the backend directory):
+    WEB_CONCURRENCY=4 PORT=8001 python serve.py
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("serve")
+
+HOST = os.getenv('HOST', '0.0.0.0')
+PORT = int(os.getenv('PORT', '8001'))
+WORKERS = int(os.getenv('WEB_CONCURRENCY', str(os.cpu_count() or 1)))
+# Connections to Mongo across all workers; the driver default is 100 per process
+MONGO_TOTAL_POOL_SIZE = int(os.getenv('MONGO_TOTAL_POOL_SIZE', '100'))
+# Seconds a worker gets to finish in-flight requests before it is killed
+GRACEFUL_TIMEOUT = float(os.getenv('GRACEFUL_TIMEOUT', '30'))
+# Seconds a replacement worker gets to start during a rolling restart
+STARTUP_TIMEOUT = float(os.getenv('WORKER_STARTUP_TIMEOUT', '120'))
+
+def worker_pool_env(workers: int) -> Dict[str, str]:
+    """Mongo pool settings for one worker, from the totals for the whole server"""
+    if os.getenv('MONGO_MAX_POOL_SIZE'):
+        return {}
+    max_pool = max(1, MONGO_TOTAL_POOL_SIZE // workers)
+    env = {'MONGO_MAX_POOL_SIZE': str(max_pool)}
+    min_pool = os.getenv('MONGO_MIN_POOL_SIZE')
+    if min_pool and int(min_pool) > max_pool:
+        env['MONGO_MIN_POOL_SIZE'] = str(max_pool)
+    return env
+
+def run_worker(sock: socket.socket, env: Dict[str, str], leader, ready, started):
+    """Worker process body: configure, import the app and serve on the shared socket"""
+    os.environ.update(env)
+
+    import uvicorn
+    from coordination import coordinator
+
+    coordinator.configure(leader, ready)
+
+    class WorkerServer(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets=sockets)
+            # A failed lifespan startup leaves should_exit set
+            if not self.should_exit:
+                started.set()
+
+    config = uvicorn.Config("server:app")
+    WorkerServer(config).run(sockets=[sock])
+
+class Worker:
+    def __init__(self, context, sock: socket.socket, env: Dict[str, str], leader, ready):
+        self.started = context.Event()
+        self.process = context.Process(
+            target=run_worker,
+            args=(sock, env, leader, ready, self.started),
+            name="api-worker"
+        )
+
+    def start(self):
+        self.process.start()
+
+    def stop(self, timeout: float = GRACEFUL_TIMEOUT):
+        """SIGTERM lets uvicorn finish in-flight requests; kill if it takes too long"""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            logger.warning(f"Worker {self.process.pid} did not stop in {timeout}s, killing it")
+            self.process.kill()
+            self.process.join()
+
+class Supervisor:
+    def __init__(self, workers: int = WORKERS, host: str = HOST, port: int = PORT):
+        self.workers_count = workers
+        self.host = host
+        self.port = port
+        self.context = multiprocessing.get_context("spawn")
+        self.leader = self.context.Value("i", 0)
+        self.ready = self.context.Event()
+        self.env = worker_pool_env(workers)
+        self.workers: List[Worker] = []
+        self.sock: Optional[socket.socket] = None
+        self._restart_requested = False
+        self._stop_requested = False
+
+    def bind(self):
+        self.sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(2048)
+        self.sock.set_inheritable(True)
+
+    def spawn(self) -> Worker:
+        worker = Worker(self.context, self.sock, self.env, self.leader, self.ready)
+        worker.start()
+        logger.info(f"Started worker {worker.process.pid}")
+        return worker
+
+    def wait_started(self, worker: Worker, timeout: float = STARTUP_TIMEOUT) -> bool:
+        """Wait for a worker to finish startup; False if it exits or times out first"""
+        deadline = time.monotonic() + timeout
+        while not worker.started.wait(0.5):
+            if not worker.process.is_alive() or time.monotonic() > deadline:
+                return False
+        return True
+
+    def retire(self, worker: Worker):
+        # Free the leader slot first so the next worker to start takes over
+        with self.leader.get_lock():
+            if self.leader.value == worker.process.pid:
+                self.leader.value = 0
+        worker.stop()
+
+    def rolling_restart(self):
+        logger.info("Rolling restart of all workers")
+        for index, old in enumerate(list(self.workers)):
+            new = self.spawn()
+            if not self.wait_started(new):
+                logger.error(f"Replacement worker {new.process.pid} did not start, aborting rolling restart")
+                new.stop(timeout=5)
+                return
+            self.workers[index] = new
+            self.retire(old)
+            logger.info(f"Replaced worker {old.process.pid} with {new.process.pid}")
+
+    def reap(self):
+        """Replace workers that exited unexpectedly"""
+        for index, worker in enumerate(self.workers):
+            if not worker.process.is_alive():
+                logger.warning(f"Worker {worker.process.pid} exited with code {worker.process.exitcode}, restarting it")
+                self.retire(worker)
+                self.workers[index] = self.spawn()
+
+    def _on_hup(self, signum, frame):
+        self._restart_requested = True
+
+    def _on_stop(self, signum, frame):
+        self._stop_requested = True
+
+    def run(self):
+        self.bind()
+        signal.signal(signal.SIGHUP, self._on_hup)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        logger.info(f"Serving on {self.host}:{self.port} with {self.workers_count} workers {self.env}")
+
+        self.workers = [self.spawn() for _ in range(self.workers_count)]
+        while not self._stop_requested:
+            if self._restart_requested:
+                self._restart_requested = False
+                self.rolling_restart()
+            self.reap()
+            time.sleep(0.5)
+
+        logger.info("Stopping workers...")
+        for worker in self.workers:
+            if worker.process.is_alive():
+                worker.process.terminate()
+        for worker in self.workers:
+            worker.stop()
+        self.sock.close()
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    Supervisor().run()
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,38 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
+import asyncio
 import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
+from functools import partial
 
 # Import database connection
-from database import connect_to_mongo, close_mongo_connection, init_database
+from database import connect_to_mongo, close_mongo_connection, init_database, get_database
+
+# Import HTTP caching and serialization helpers
+from http_cache import CachedRepresentation, cached_response
+from serialization import dumps, FastJSONResponse
+from pagination import NEXT_CURSOR_HEADER
+
+# Import email delivery
+from email_service import email_service
+from outbox import outbox_workers
+from digest import DIGEST_ENABLED, digest_flusher
+
+# Import background maintenance jobs and worker coordination
+from counters import run_counter_reconciliation
+from coordination import coordinator
+from archive import ARCHIVE_ENABLED, run_contact_archival
+
+# Import request protection and instrumentation
+from rate_limit import RateLimitMiddleware, rate_limiter
+from metrics import MetricsMiddleware, registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from profiling import ProfilingMiddleware
 
 # Import route modules
-from routes import testimonials, contact
+from routes import testimonials, contact, content, admin
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -27,14 +49,26 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting CãoFidèle API server...")
     await connect_to_mongo()
-    await init_database()
+    # With several workers only the leader of the first generation migrates; the rest wait until it is done
+    await coordinator.bootstrap(init_database)
+    outbox_workers.start()
+    # Leader-only jobs; another worker takes them over if the leader exits
+    leader_jobs = [asyncio.create_task(coordinator.run_as_leader(run_counter_reconciliation))]
+    if DIGEST_ENABLED:
+        leader_jobs.append(asyncio.create_task(coordinator.run_as_leader(digest_flusher.run)))
+    if ARCHIVE_ENABLED:
+        leader_jobs.append(asyncio.create_task(coordinator.run_as_leader(partial(run_contact_archival, get_database))))
     logger.info("✅ Server startup completed")
     
     yield
     
     # Shutdown
     logger.info("🔄 Shutting down server...")
+    for job in leader_jobs:
+        job.cancel()
+    await outbox_workers.stop()
     await close_mongo_connection()
+    email_service.shutdown()
     logger.info("✅ Server shutdown completed")
 
 # Create the main app
@@ -42,6 +76,7 @@ app = FastAPI(
     title="CãoFidèle API",
     description="API para o sistema de treinamento canino CãoFidèle",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -51,22 +86,44 @@ api_router = APIRouter(prefix="/api")
 # Add routes
 api_router.include_router(testimonials.router)
 api_router.include_router(contact.router)
+api_router.include_router(content.router)
+api_router.include_router(admin.router)
 
 # Health check endpoint
+HEALTH_BODY = CachedRepresentation(
+    dumps({"message": "CãoFidèle API is running!", "status": "healthy"})
+)
+HEALTH_CACHE_CONTROL = os.getenv('HEALTH_CACHE_CONTROL', 'no-cache')
+
 @api_router.get("/")
-async def health_check():
-    return {"message": "CãoFidèle API is running!", "status": "healthy"}
+async def health_check(request: Request):
+    return cached_response(request, HEALTH_BODY, HEALTH_CACHE_CONTROL)
 
 # Include the router in the main app
 app.include_router(api_router)
 
-# CORS middleware
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+# Opt-in per-request profiling (inside the rate limiter, so rejections are not profiled)
+app.add_middleware(ProfilingMiddleware, get_db=get_database)
+
+# Rate limiting and load shedding for write endpoints
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+# Request latency metrics (outside the rate limiter, so rejections are counted)
+app.add_middleware(MetricsMiddleware)
+
+# CORS middleware (outermost, so rejections carry CORS headers too)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 logger.info("🐕 CãoFidèle API configured successfully")
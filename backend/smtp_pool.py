@@ -0,0 +1,153 @@
+import smtplib
+import threading
+import time
+import queue
+from contextlib import contextmanager
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+def is_connection_error(error: BaseException) -> bool:
+    """True for a lost connection, False for SMTP replies such as a refused recipient"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    # SMTPException subclasses OSError; only bare socket errors mean the link is gone
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+class PooledSMTPSession:
+    """Authenticated SMTP session borrowed from an SMTPConnectionPool"""
+
+    def __init__(self, pool: "SMTPConnectionPool", connection: smtplib.SMTP):
+        self._pool = pool
+        self.connection = connection
+        self.last_used = time.monotonic()
+        self.last_checked = self.last_used
+        # Set when the connection failed; the pool closes the session instead of reusing it
+        self.broken = False
+
+    def sendmail(self, from_addr: str, to_addr: str, text: str):
+        """Send a message, reconnecting once if the connection was lost
+
+        If the retry fails too the session is marked broken, so the pool
+        drops it even when the caller swallows the error.
+        """
+        try:
+            self.connection.sendmail(from_addr, to_addr, text)
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+            logger.info(f"SMTP connection lost ({type(e).__name__}), reconnecting")
+            self._pool._close(self.connection)
+            try:
+                self.connection = self._pool._connect()
+                self.connection.sendmail(from_addr, to_addr, text)
+            except Exception:
+                self.broken = True
+                raise
+        self.last_used = time.monotonic()
+
+class SMTPConnectionPool:
+    """Small pool of persistent, authenticated SMTP sessions
+
+    Sessions are reused across messages so only the first send pays for the
+    TCP connect, STARTTLS and login. Idle sessions are health checked with
+    NOOP before reuse and dropped once they exceed ``max_idle`` seconds.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str = '',
+        max_size: int = 2,
+        max_idle: float = 120.0,
+        health_check_interval: float = 15.0,
+        timeout: float = 30.0,
+        starttls: bool = True
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.starttls = starttls
+
+        self._idle: "queue.LifoQueue[PooledSMTPSession]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                connection.starttls()
+            if self.password:  # Only authenticate if password is provided
+                connection.login(self.user, self.password)
+        except Exception:
+            self._close(connection)
+            raise
+        return connection
+
+    def _close(self, connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    def _is_healthy(self, session: PooledSMTPSession) -> bool:
+        now = time.monotonic()
+        if now - session.last_used > self.max_idle:
+            return False
+        if now - session.last_checked < self.health_check_interval:
+            return True
+        try:
+            healthy = session.connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            healthy = False
+        session.last_checked = now
+        return healthy
+
+    def _checkout(self) -> PooledSMTPSession:
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                return PooledSMTPSession(self, self._connect())
+
+            if self._is_healthy(session):
+                return session
+            self._close(session.connection)
+
+    @contextmanager
+    def session(self):
+        """Borrow a session for one or more messages"""
+        self._slots.acquire()
+        session: Optional[PooledSMTPSession] = None
+        try:
+            session = self._checkout()
+            yield session
+        except Exception as e:
+            if session is not None and is_connection_error(e):
+                session.broken = True
+            raise
+        finally:
+            if session is not None:
+                # Never hand a broken connection back to the pool
+                if session.broken:
+                    self._close(session.connection)
+                else:
+                    self._idle.put(session)
+            self._slots.release()
+
+    def close(self):
+        """Close every idle session"""
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(session.connection)
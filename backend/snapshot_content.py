@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Write the site content bundle to a JSON file for prerendering or a CDN
+
+The file holds the same bytes /api/content serves. By default the content
+is read from MONGO_URL/DB_NAME; --from-seed uses data/site_content.json so
+the snapshot can be built without a database.
+
+Usage (from the backend directory):
+    python snapshot_content.py build/content.json [--from-seed]
+"""
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from content import ContentBundle, load_content_bundle, load_seed
+
+async def build_bundle(from_seed: bool) -> ContentBundle:
+    if from_seed:
+        return ContentBundle(0, load_seed())
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        return await load_content_bundle(client[os.environ.get('DB_NAME', 'caofidele')])
+    finally:
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--from-seed", action="store_true", help="snapshot the seed file instead of the database")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    bundle = asyncio.run(build_bundle(args.from_seed))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_bytes(bundle.bundle.body)
+    print(f"Wrote content version {bundle.version} ({len(bundle.bundle.body)} bytes, ETag {bundle.bundle.etag()}) to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -95,6 +95,37 @@ export const contactService = {
   }
 };
 
+// Site content API service
+export const contentService = {
+  // Get every content section in one bundle
+  getAll: async () => {
+    try {
+      const response = await fetch(`${API_BASE}/content/`);
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      return await response.json();
+    } catch (error) {
+      console.error('Error fetching site content:', error);
+      throw error;
+    }
+  },
+
+  // Get a single content section, e.g. 'faqData'
+  getSection: async (section) => {
+    try {
+      const response = await fetch(`${API_BASE}/content/${section}`);
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      return await response.json();
+    } catch (error) {
+      console.error(`Error fetching site content section ${section}:`, error);
+      throw error;
+    }
+  }
+};
+
 // Health check service
 export const healthService = {
   check: async () => {
@@ -131,6 +162,7 @@ export const handleApiError = (error) => {
 export default {
   testimonialService,
   contactService,
+  contentService,
   healthService,
   handleApiError
 };
\ No newline at end of file
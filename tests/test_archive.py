@@ -0,0 +1,84 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import archive
+from archive import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_COLLECTION,
+    ARCHIVE_HOLD_DAYS,
+    ARCHIVE_STALE_AFTER_DAYS,
+    archive_contact_requests,
+    build_archive_query,
+    restore_contact_request
+)
+
+NOW = datetime(2026, 6, 1, 12, 0, 0)
+
+def _lead(status: str, age_days: float, touched_days: float = None) -> dict:
+    created_at = datetime.utcnow() - timedelta(days=age_days)
+    touched = age_days if touched_days is None else touched_days
+    return {
+        "id": str(uuid.uuid4()),
+        "name": "Cliente",
+        "status": status,
+        "createdAt": created_at,
+        "updatedAt": datetime.utcnow() - timedelta(days=touched)
+    }
+
+def test_query_cutoffs():
+    query = build_archive_query(now=NOW)
+    closed, stale = query["$or"]
+    assert closed == {
+        "status": {"$in": archive.ARCHIVE_STATUSES},
+        "createdAt": {"$lt": NOW - timedelta(days=ARCHIVE_AFTER_DAYS)}
+    }
+    assert stale == {"createdAt": {"$lt": NOW - timedelta(days=ARCHIVE_STALE_AFTER_DAYS)}}
+    assert query["updatedAt"] == {"$not": {"$gte": NOW - timedelta(days=ARCHIVE_HOLD_DAYS)}}
+
+def test_override_shortens_the_closed_cutoff_only():
+    closed, stale = build_archive_query(now=NOW, older_than_days=7)["$or"]
+    assert closed["createdAt"] == {"$lt": NOW - timedelta(days=7)}
+    assert stale["createdAt"] == {"$lt": NOW - timedelta(days=ARCHIVE_STALE_AFTER_DAYS)}
+
+def test_override_never_makes_stale_leads_younger_than_closed_ones():
+    closed, stale = build_archive_query(now=NOW, older_than_days=ARCHIVE_STALE_AFTER_DAYS + 30)["$or"]
+    assert stale["createdAt"] == closed["createdAt"]
+
+@pytest.mark.anyio
+async def test_archive_moves_only_aged_untouched_leads(db):
+    due_closed = _lead("completed", ARCHIVE_AFTER_DAYS + 10)
+    due_stale = _lead("pending", ARCHIVE_STALE_AFTER_DAYS + 10)
+    recent = _lead("completed", 5)
+    open_lead = _lead("pending", ARCHIVE_AFTER_DAYS + 10)
+    held = _lead("completed", ARCHIVE_AFTER_DAYS + 10, touched_days=1)
+    legacy = _lead("completed", ARCHIVE_AFTER_DAYS + 10)
+    legacy.pop("updatedAt")
+    await db.contact_requests.insert_many([due_closed, due_stale, recent, open_lead, held, legacy])
+
+    assert await archive_contact_requests(db, batch_size=2) == 3
+
+    hot = {document["id"] async for document in db.contact_requests.find({})}
+    cold = {document["id"] async for document in db[ARCHIVE_COLLECTION].find({})}
+    assert hot == {recent["id"], open_lead["id"], held["id"]}
+    assert cold == {due_closed["id"], due_stale["id"], legacy["id"]}
+    assert await db[ARCHIVE_COLLECTION].count_documents({"archivedAt": {"$exists": True}}) == 3
+
+@pytest.mark.anyio
+async def test_restored_lead_is_not_archived_again(db):
+    lead = _lead("completed", ARCHIVE_AFTER_DAYS + 10)
+    await db.contact_requests.insert_one(lead)
+    assert await archive_contact_requests(db) == 1
+
+    assert await restore_contact_request(db, lead["id"])
+    restored = await db.contact_requests.find_one({"id": lead["id"]})
+    assert "archivedAt" not in restored
+    assert restored["restoredAt"] == restored["updatedAt"]
+
+    assert await archive_contact_requests(db) == 0
+    assert await db[ARCHIVE_COLLECTION].count_documents({}) == 0
+
+@pytest.mark.anyio
+async def test_restore_unknown_lead(db):
+    assert not await restore_contact_request(db, "missing")
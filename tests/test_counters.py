@@ -0,0 +1,76 @@
+import uuid
+
+import pytest
+
+from counters import (
+    CONTACT_COUNTERS_ID,
+    get_contact_counters,
+    TESTIMONIAL_SUMMARY_ID,
+    get_testimonial_summary,
+    record_contact_created,
+    record_contact_status_change,
+    record_testimonial_approval
+)
+
+def _lead(status: str = "pending") -> dict:
+    return {"id": str(uuid.uuid4()), "name": "Cliente", "status": status}
+
+@pytest.mark.anyio
+async def test_first_insert_on_existing_data_builds_the_counters(db):
+    await db.contact_requests.insert_many([_lead() for _ in range(50)])
+    await db.contact_requests.insert_one(_lead())
+    await record_contact_created(db, "pending")
+
+    counters = await db.counters.find_one({"_id": CONTACT_COUNTERS_ID})
+    assert counters["total"] == 51
+    assert counters["by_status"]["pending"] == 51
+
+@pytest.mark.anyio
+async def test_first_status_change_on_existing_data_builds_the_counters(db):
+    await db.contact_requests.insert_many([_lead() for _ in range(3)] + [_lead("scheduled")])
+    await record_contact_status_change(db, "pending", "scheduled")
+
+    counters = await db.counters.find_one({"_id": CONTACT_COUNTERS_ID})
+    assert counters["by_status"]["pending"] == 3
+    assert counters["by_status"]["scheduled"] == 1
+
+@pytest.mark.anyio
+async def test_later_writes_increment_the_counters(db):
+    await db.contact_requests.insert_one(_lead())
+    assert (await get_contact_counters(db))["total"] == 1
+
+    await record_contact_created(db, "pending")
+    await record_contact_status_change(db, "pending", "contacted")
+
+    counters = await db.counters.find_one({"_id": CONTACT_COUNTERS_ID})
+    assert counters["total"] == 2
+    assert counters["by_status"]["pending"] == 1
+    assert counters["by_status"]["contacted"] == 1
+
+def _testimonial(rating: int, breed: str, approved: bool = True) -> dict:
+    return {"id": str(uuid.uuid4()), "rating": rating, "breed": breed, "approved": approved}
+
+@pytest.mark.anyio
+async def test_first_rejection_on_seeded_testimonials_builds_the_summary(db):
+    seeded = [_testimonial(5, "Labrador"), _testimonial(4, "Labrador"), _testimonial(5, "Poodle"), _testimonial(3, "Beagle")]
+    await db.testimonials.insert_many(seeded)
+    rejected = seeded[-1]
+    await db.testimonials.update_one({"id": rejected["id"]}, {"$set": {"approved": False}})
+    await record_testimonial_approval(db, rejected, False)
+
+    summary = await db.counters.find_one({"_id": TESTIMONIAL_SUMMARY_ID})
+    assert summary["count"] == 3
+    assert summary["rating_sum"] == 14
+    assert summary["breeds"] == {"Labrador": 2, "Poodle": 1}
+    assert all(count >= 0 for count in summary["ratings"].values())
+
+@pytest.mark.anyio
+async def test_later_approvals_increment_the_summary(db):
+    await db.testimonials.insert_one(_testimonial(5, "Labrador"))
+    await get_testimonial_summary(db)
+
+    await record_testimonial_approval(db, _testimonial(3, "Poodle"), True)
+
+    summary = await db.counters.find_one({"_id": TESTIMONIAL_SUMMARY_ID})
+    assert (summary["count"], summary["rating_sum"]) == (2, 8)
+    assert summary["breeds"] == {"Labrador": 1, "Poodle": 1}
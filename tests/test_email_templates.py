@@ -0,0 +1,55 @@
+from email_templates import (
+    CompiledTemplate,
+    CONFIRMATION_TEMPLATE,
+    CONTACT_NOTIFICATION_TEMPLATE,
+    render_digest
+)
+
+HOSTILE = {
+    "name": "<script>alert('x')</script>",
+    "email": "a&b@example.com",
+    "phone": "11 9999-8888",
+    "dogName": "\"Rex\"",
+    "dogBreed": "Vira-lata",
+    "selectedPlan": "Básico",
+    "message": "<b>oi</b>"
+}
+
+def test_compiled_template_fills_slots_in_order():
+    template = CompiledTemplate("Olá {name}, seu cão {dogName} ({name})")
+    assert template.fields == ("name", "dogName", "name")
+    assert template.render({"name": "Ana", "dogName": "Rex"}) == "Olá Ana, seu cão Rex (Ana)"
+
+def test_compiled_template_inserts_values_verbatim():
+    # Escaping is the caller's job, done once per field by EmailTemplate
+    assert CompiledTemplate("<p>{x}</p>").render({"x": "<b>"}) == "<p><b></p>"
+
+def test_html_body_escapes_contact_fields():
+    html_body, _ = CONTACT_NOTIFICATION_TEMPLATE.render(HOSTILE)
+    assert "<script>" not in html_body
+    assert "&lt;script&gt;alert(&#x27;x&#x27;)&lt;/script&gt;" in html_body
+    assert "a&amp;b@example.com" in html_body
+    assert "&quot;Rex&quot;" in html_body
+    assert "&lt;b&gt;oi&lt;/b&gt;" in html_body
+
+def test_text_body_keeps_fields_unescaped():
+    _, text_body = CONTACT_NOTIFICATION_TEMPLATE.render(HOSTILE)
+    assert "<script>alert('x')</script>" in text_body
+    assert "&lt;" not in text_body
+
+def test_optional_block_is_omitted_without_its_field():
+    with_message, _ = CONTACT_NOTIFICATION_TEMPLATE.render(HOSTILE)
+    without_message, _ = CONTACT_NOTIFICATION_TEMPLATE.render({**HOSTILE, "message": ""})
+    assert "&lt;b&gt;oi&lt;/b&gt;" in with_message
+    assert "&lt;b&gt;oi&lt;/b&gt;" not in without_message
+
+def test_confirmation_escapes_and_uses_defaults():
+    html_body, text_body = CONFIRMATION_TEMPLATE.render({"name": "<i>Ana</i>"})
+    assert "&lt;i&gt;Ana&lt;/i&gt;" in html_body
+    assert "<i>Ana</i>" in text_body
+
+def test_digest_escapes_every_lead():
+    html_body, text_body = render_digest([HOSTILE, {**HOSTILE, "name": "Ana & Bia"}])
+    assert "<script>" not in html_body
+    assert "Ana &amp; Bia" in html_body
+    assert "Ana & Bia" in text_body
@@ -0,0 +1,47 @@
+import gzip
+
+import pytest
+
+import http_cache
+from http_cache import CachedRepresentation, MIN_COMPRESS_SIZE, negotiate_encoding
+
+LARGE = MIN_COMPRESS_SIZE
+
+@pytest.fixture
+def no_brotli(monkeypatch):
+    monkeypatch.setattr(http_cache, "brotli", None)
+
+@pytest.mark.parametrize("header", [None, "", "identity"])
+def test_identity_without_a_usable_coding(header):
+    assert negotiate_encoding(header, LARGE) == "identity"
+
+def test_small_bodies_are_not_compressed():
+    assert negotiate_encoding("gzip, br", MIN_COMPRESS_SIZE - 1) == "identity"
+
+def test_gzip(no_brotli):
+    assert negotiate_encoding("gzip, deflate", LARGE) == "gzip"
+    assert negotiate_encoding("GZIP", LARGE) == "gzip"
+
+def test_brotli_is_preferred_when_available():
+    expected = "br" if http_cache.brotli is not None else "gzip"
+    assert negotiate_encoding("gzip, deflate, br", LARGE) == expected
+
+def test_brotli_is_skipped_when_not_installed(no_brotli):
+    assert negotiate_encoding("br", LARGE) == "identity"
+    assert negotiate_encoding("br, gzip", LARGE) == "gzip"
+
+@pytest.mark.parametrize("header", ["gzip;q=0", "gzip; q=0", "*;q=0", "gzip;q=nonsense"])
+def test_refused_codings(header, no_brotli):
+    assert negotiate_encoding(header, LARGE) == "identity"
+
+def test_wildcard_accepts_gzip(no_brotli):
+    assert negotiate_encoding("*", LARGE) == "gzip"
+    assert negotiate_encoding("gzip;q=0, *", LARGE) == "identity"
+
+def test_variants_share_a_digest_but_not_an_etag():
+    representation = CachedRepresentation(b'{"a": 1}' * 100)
+    assert representation.etag() != representation.etag("gzip")
+    assert gzip.decompress(representation.variant("gzip")) == representation.body
+    assert representation.matches(representation.etag("gzip"))
+    assert representation.matches(f"W/{representation.etag()}")
+    assert not representation.matches('"something-else"')
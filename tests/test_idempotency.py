@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+import idempotency
+
+CONTACT = {
+    "name": "Maria Silva",
+    "email": "maria@example.com",
+    "phone": "(11) 91234-5678",
+    "dogName": "Thor"
+}
+
+def test_fingerprint_ignores_formatting_differences():
+    first = idempotency.contact_fingerprint("Maria@Example.com ", "(11) 91234-5678", "Thor  Junior")
+    second = idempotency.contact_fingerprint("maria@example.com", "11912345678", "thor junior")
+    assert first == second
+    assert first.startswith("contact:")
+
+def test_fingerprint_differs_per_dog():
+    assert idempotency.contact_fingerprint("a@b.com", "1", "Thor") != idempotency.contact_fingerprint("a@b.com", "1", "Luna")
+
+def test_header_keys_are_hashed_and_scoped():
+    key = idempotency.header_key("contact", "$weird.key")
+    assert key.startswith("contact:key:")
+    assert "$" not in key and "." not in key
+    assert key != idempotency.header_key("testimonial", "$weird.key")
+
+@pytest.mark.anyio
+async def test_claim_then_replay_stored_response(db):
+    assert await idempotency.claim(db, "k") is None
+    await idempotency.store_response(db, "k", {"success": True, "message": "ok"})
+
+    previous = await idempotency.claim(db, "k")
+    assert previous["response"] == {"success": True, "message": "ok"}
+
+@pytest.mark.anyio
+async def test_release_lets_the_client_retry(db):
+    assert await idempotency.claim(db, "k") is None
+    await idempotency.release(db, "k")
+    assert await idempotency.claim(db, "k") is None
+
+@pytest.mark.anyio
+async def test_release_keeps_a_completed_response(db):
+    assert await idempotency.claim(db, "k") is None
+    await idempotency.store_response(db, "k", {"success": True, "message": "ok"})
+    await idempotency.release(db, "k")
+    assert (await idempotency.claim(db, "k"))["response"] is not None
+
+@pytest.mark.anyio
+async def test_expired_claim_is_taken_over(db):
+    stale = datetime.utcnow() - timedelta(seconds=idempotency.IDEMPOTENCY_WINDOW + 1)
+    await db.idempotency_keys.insert_one({"_id": "k", "createdAt": stale, "response": {"success": True, "message": "old"}})
+    assert await idempotency.claim(db, "k") is None
+
+@pytest.fixture
+def client(db):
+    from server import app
+    from database import get_database
+    from rate_limit import rate_limiter
+
+    rate_limiter._clients.clear()
+    app.dependency_overrides[get_database] = lambda: db
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.clear()
+
+@pytest.mark.anyio
+async def test_repeated_submission_is_answered_once(client, db):
+    headers = {idempotency.IDEMPOTENCY_HEADER: "form-1"}
+    first = await client.post("/api/contact/schedule", json=CONTACT, headers=headers)
+    second = await client.post("/api/contact/schedule", json=CONTACT, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert await db.contact_requests.count_documents({}) == 1
+
+@pytest.mark.anyio
+async def test_failure_to_cache_the_response_does_not_allow_a_duplicate(client, db, monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise RuntimeError("idempotency store unavailable")
+    monkeypatch.setattr(idempotency, "store_response", unavailable)
+
+    headers = {idempotency.IDEMPOTENCY_HEADER: "form-2"}
+    first = await client.post("/api/contact/schedule", json=CONTACT, headers=headers)
+    retry = await client.post("/api/contact/schedule", json=CONTACT, headers=headers)
+
+    assert first.status_code == 200
+    assert retry.status_code == 409
+    assert await db.contact_requests.count_documents({}) == 1
@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from pagination import decode_cursor, encode_cursor, fetch_page, keyset_filter
+
+def _token(payload) -> str:
+    raw = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def test_cursor_round_trip_with_datetime():
+    created_at = datetime(2024, 12, 1, 10, 30, 15, 123000)
+    token = encode_cursor({"createdAt": created_at, "id": "abc"})
+    assert "=" not in token
+    assert decode_cursor(token) == (created_at, "abc")
+
+def test_cursor_round_trip_with_legacy_string_timestamp():
+    token = encode_cursor({"createdAt": "2024-12-01T10:00:00Z", "id": "abc"})
+    assert decode_cursor(token) == ("2024-12-01T10:00:00Z", "abc")
+
+@pytest.mark.parametrize("token", [
+    "not-base64!!",
+    _token(["d", "yesterday", "abc"]),
+    _token(["x", "2024-12-01T10:00:00", "abc"]),
+    _token(["d", "2024-12-01T10:00:00"]),
+    _token({"kind": "d"}),
+    "",
+])
+def test_tampered_cursor_is_rejected(token):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(token)
+    assert error.value.status_code == 400
+
+def test_keyset_filter_after_date_includes_legacy_strings():
+    token = encode_cursor({"createdAt": datetime(2024, 12, 1), "id": "b"})
+    clauses = keyset_filter(token)["$or"]
+    assert {"createdAt": {"$type": "string"}} in clauses
+
+def test_keyset_filter_after_string_stays_among_strings():
+    token = encode_cursor({"createdAt": "2024-12-01T10:00:00", "id": "b"})
+    clauses = keyset_filter(token)["$or"]
+    assert {"createdAt": {"$type": "string"}} not in clauses
+
+@pytest.mark.anyio
+async def test_fetch_page_walks_every_document_once(db):
+    start = datetime(2024, 1, 1)
+    # Pairs share a timestamp so the id tie-breaker is exercised
+    await db.items.insert_many([
+        {"id": f"{i:03d}", "createdAt": start + timedelta(minutes=i // 2)} for i in range(25)
+    ])
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await fetch_page(db.items, {}, {"_id": 0}, cursor, 10)
+        seen.extend(document["id"] for document in page)
+        if cursor is None:
+            break
+
+    assert seen == [f"{i:03d}" for i in reversed(range(25))]
+
+@pytest.mark.anyio
+async def test_fetch_page_strips_the_sort_key_it_added(db):
+    await db.items.insert_many([
+        {"id": str(i), "name": f"n{i}", "createdAt": datetime(2024, 1, 1) + timedelta(days=i)} for i in range(3)
+    ])
+    page, cursor = await fetch_page(db.items, {}, {"_id": 0, "name": 1}, None, 2)
+    assert [set(document) for document in page] == [{"name", "id"}, {"name", "id"}]
+    assert cursor is not None
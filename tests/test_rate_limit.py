@@ -0,0 +1,68 @@
+import pytest
+
+from rate_limit import RateLimiter, RouteLimit, TokenBucket, parse_limit
+
+SCOPE = {"client": ("203.0.113.7", 5000), "headers": []}
+
+@pytest.mark.parametrize("value", [None, "", "off", "OFF", "0", " 0 "])
+def test_parse_limit_disabled(value):
+    assert parse_limit(value) is None
+
+def test_parse_limit_count_per_seconds():
+    assert parse_limit("5/60") == (5 / 60, 5)
+    assert parse_limit("10") == (10, 10)
+
+@pytest.mark.parametrize("value", ["0/60", "5/0", "-1/60", "5/-2", "abc", "5/minute"])
+def test_parse_limit_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_limit(value)
+
+def test_bucket_allows_a_burst_then_reports_the_wait():
+    bucket = TokenBucket(rate=1.0, capacity=2)
+    now = bucket.updated
+    assert bucket.take(now) == 0
+    assert bucket.take(now) == 0
+    assert bucket.take(now) == pytest.approx(1.0)
+
+def test_bucket_refills_over_time():
+    bucket = TokenBucket(rate=0.5, capacity=1)
+    now = bucket.updated
+    assert bucket.take(now) == 0
+    assert bucket.take(now + 1) == pytest.approx(1.0)
+    assert bucket.take(now + 2) == 0
+
+def test_wait_does_not_consume():
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    now = bucket.updated
+    assert bucket.wait(now) == 0
+    assert bucket.wait(now) == 0
+    assert bucket.tokens == 1
+
+def test_client_limit_rejects_with_429():
+    route = RouteLimit("contact", (1 / 60, 2), None)
+    limiter = RateLimiter({}, max_inflight=10)
+    assert limiter.check(route, SCOPE) is None
+    assert limiter.check(route, SCOPE) is None
+    status, retry_after, reason = limiter.check(route, SCOPE)
+    assert (status, reason) == (429, "client")
+    assert retry_after > 0
+
+def test_global_rejection_does_not_charge_the_client():
+    route = RouteLimit("contact", (1 / 60, 3), (1 / 60, 1))
+    limiter = RateLimiter({}, max_inflight=10)
+    assert limiter.check(route, SCOPE) is None
+    for _ in range(3):
+        assert limiter.check(route, SCOPE)[2] == "global"
+    assert limiter._clients[("contact", "203.0.113.7")].tokens == pytest.approx(2, abs=0.01)
+
+def test_inflight_cap_sheds_with_503():
+    route = RouteLimit("contact", None, None)
+    limiter = RateLimiter({}, max_inflight=1)
+    limiter.inflight = 1
+    assert limiter.check(route, SCOPE)[:1] == (503,)
+    assert limiter.stats()["rejected"] == {"contact:shed": 1}
+
+def test_forwarded_address_only_when_trusted():
+    scope = {"client": ("10.0.0.1", 1), "headers": [(b"x-forwarded-for", b"198.51.100.2, 10.0.0.1")]}
+    assert RateLimiter({}, 1).client_ip(scope) == "10.0.0.1"
+    assert RateLimiter({}, 1, trust_forwarded=True).client_ip(scope) == "198.51.100.2"
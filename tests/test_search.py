@@ -0,0 +1,40 @@
+import search
+from search import build_testimonial_query, location_keys, normalize_key
+
+def test_normalize_key_folds_case_accents_and_spaces():
+    assert normalize_key("  Pastor   Alemão ") == "pastor alemao"
+    assert normalize_key("SÃO PAULO") == "sao paulo"
+
+def test_location_keys_cover_city_state_and_both():
+    assert location_keys("São Paulo, SP") == ["sao paulo", "sp", "sao paulo sp"]
+    assert location_keys("Osasco") == ["osasco"]
+
+def test_search_keys_stored_with_testimonials():
+    # Imported through the module: pytest would collect a bare test* name
+    assert search.testimonial_search_keys("Golden Retriever", "Guarulhos - SP") == {
+        "breedKey": "golden retriever",
+        "locationKeys": ["guarulhos", "sp", "guarulhos sp"]
+    }
+
+def test_unfiltered_query_lists_approved_only():
+    assert build_testimonial_query() == {"approved": True}
+
+def test_filters_use_the_normalized_keys():
+    query = build_testimonial_query(breed="Pastor Alemão", min_rating=4, location="São Paulo, SP")
+    assert query == {
+        "approved": True,
+        "breedKey": "pastor alemao",
+        "locationKeys": "sao paulo sp",
+        "rating": {"$gte": 4}
+    }
+
+def test_location_filter_matches_a_stored_key():
+    stored = location_keys("São Paulo, SP")
+    for typed in ("são paulo", "SP", "Sao Paulo, SP"):
+        assert build_testimonial_query(location=typed)["locationKeys"] in stored
+
+def test_empty_filters_are_ignored():
+    assert build_testimonial_query(breed="", min_rating=0, location="", q="") == {"approved": True}
+
+def test_text_search():
+    assert build_testimonial_query(q="ansiedade")["$text"] == {"$search": "ansiedade"}